@@ -0,0 +1,292 @@
+"""
+ベンチマーク用のローカルPigeonium APIサーバー。
+/ , /balance, /balances, /currency, /transaction, /transactions, /variable, /contract を実装し、
+応答の遅延とトランザクションのサイズを設定できます。署名の検証や残高の整合性チェックは行いません。
+Accept-Encoding に応じてレスポンスを gzip (zstandardがインストールされていればzstdも) で圧縮し、
+/transactions は Accept に pigeonium_wire.CONTENT_TYPE が含まれていればバイナリ形式で返します。
+
+単体で起動する場合:
+    python -m benchmarks.mock_server --port 14540 --transactions 10000 --latency-ms 5
+"""
+import argparse
+import gzip
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, List, Any, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+import pigeonium_wire
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BASE_CURRENCY_ID = bytes(16)
+ADMIN_ADDRESS = bytes(15) + b"\x01"
+
+class MockLedger:
+    """モックサーバーが保持するトランザクションと残高。"""
+
+    def __init__(self, transactions: int = 1000, addresses: int = 100, input_bytes: int = 0, seed: int = 0):
+        self.lock = threading.Lock()
+        self.addresses = [seed.to_bytes(8, "big") + i.to_bytes(8, "big") for i in range(addresses)]
+        self.currencies: Dict[bytes, Dict[str, Any]] = {
+            BASE_CURRENCY_ID: {
+                "currencyId": BASE_CURRENCY_ID.hex(),
+                "name": "Pigeon",
+                "symbol": "PGN",
+                "issuer": ADMIN_ADDRESS.hex(),
+                "supply": 10 ** 18,
+            }
+        }
+        self.transactions: List[Dict[str, Any]] = []
+        self.index_ids: List[int] = []
+        # (コントラクトのアドレス, キー) -> 値。いずれも16進数文字列です。コントラクトは実行しないため set_variable で設定します。
+        self.variables: Dict[Tuple[str, str], str] = {}
+        input_data = (b"\xab" * input_bytes).hex()
+        now = int(time.time()) - transactions
+        for i in range(transactions):
+            source = self.addresses[i % addresses]
+            dest = self.addresses[(i * 7 + 1) % addresses]
+            self.append({
+                "source": source.hex(),
+                "dest": dest.hex(),
+                "currencyId": BASE_CURRENCY_ID.hex(),
+                "amount": 1000 + i,
+                "feeAmount": i % 3,
+                "inputData": input_data,
+                "publicKey": (b"\x02" + source * 4)[:64].hex(),
+                "signature": (i.to_bytes(8, "big") * 8).hex(),
+                "timestamp": now + i,
+                "isContract": False,
+            })
+
+    def append(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            index_id = len(self.transactions) + 1
+            tx = dict(tx, indexId=index_id)
+            tx.setdefault("timestamp", int(time.time()))
+            tx.setdefault("isContract", False)
+            self.transactions.append(tx)
+            self.index_ids.append(index_id)
+            return tx
+
+    def query(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        limit = int(params.get("limit", 20))
+        offset = int(params.get("offset", 0))
+        ascending = params.get("sort_order", "DESC") == "ASC"
+        with self.lock:
+            lo, hi = 0, len(self.transactions)
+            if "indexId_start" in params:
+                start = int(params["indexId_start"])
+                if ascending:
+                    lo = bisect_left(self.index_ids, start)
+                else:
+                    hi = bisect_right(self.index_ids, start)
+            if "indexId_end" in params:
+                end = int(params["indexId_end"])
+                if ascending:
+                    hi = min(hi, bisect_right(self.index_ids, end))
+                else:
+                    lo = max(lo, bisect_left(self.index_ids, end))
+            rows = self.transactions[lo:hi]
+        filters = []
+        for key in ("source", "dest", "currencyId"):
+            if key in params:
+                filters.append(lambda tx, key=key, value=params[key]: tx[key] == value)
+        if "address" in params:
+            filters.append(lambda tx, value=params["address"]: value in (tx["source"], tx["dest"]))
+        if "is_contract" in params:
+            filters.append(lambda tx, value=params["is_contract"] == "True": tx["isContract"] == value)
+        if filters:
+            rows = [tx for tx in rows if all(f(tx) for f in filters)]
+        if not ascending:
+            rows = rows[::-1]
+        return rows[offset:offset + limit]
+
+    def set_variable(self, address: bytes, key: bytes, value: Optional[bytes]) -> None:
+        with self.lock:
+            if value is None:
+                self.variables.pop((address.hex(), key.hex()), None)
+            else:
+                self.variables[(address.hex(), key.hex())] = value.hex()
+
+    def balances(self, address: str) -> Dict[str, int]:
+        # 残高は実際の取引から計算せず、アドレスから決まる固定値を返します。
+        return {cu_id.hex(): int(address[:8], 16) % 1000 + 1 for cu_id in self.currencies}
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server: "MockPigeoniumServer"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        # ヘッダーと本文は別々に書き込まれるため、Nagleアルゴリズムと遅延ACKが重なると応答ごとに約40ms待たされます。
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_body(self, status: int, body: bytes, content_type: str) -> None:
+        encoding = None
+        if self.server.compression:
+            accepted = {value.split(";")[0].strip() for value in self.headers.get("Accept-Encoding", "").split(",")}
+            if "zstd" in accepted and zstandard is not None:
+                encoding, body = "zstd", zstandard.ZstdCompressor().compress(body)
+            elif "gzip" in accepted:
+                encoding, body = "gzip", gzip.compress(body, compresslevel=6)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: Any) -> None:
+        self._send_body(status, json.dumps(data, separators=(",", ":")).encode(), "application/json")
+
+    def _delay(self) -> None:
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+    def do_GET(self) -> None:
+        self._delay()
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        segments = url.path.strip("/").split("/")
+        ledger = self.server.ledger
+        if segments == [""]:
+            self._send_json(200, self.server.network_info())
+        elif segments[0] == "balance" and len(segments) == 3:
+            self._send_json(200, {"amount": ledger.balances(segments[1]).get(segments[2], 0)})
+        elif segments[0] == "balances" and len(segments) == 2:
+            self._send_json(200, ledger.balances(segments[1]))
+        elif segments[0] == "currency":
+            for cu in ledger.currencies.values():
+                if any(cu.get(key) == params.get(key) for key in ("currencyId", "name", "symbol", "issuer")):
+                    self._send_json(200, cu)
+                    return
+            self._send_json(404, {"detail": "Currency not found"})
+        elif segments[0] == "transaction" and len(segments) == 2:
+            index_id = int(segments[1])
+            if 1 <= index_id <= len(ledger.transactions):
+                self._send_json(200, ledger.transactions[index_id - 1])
+            else:
+                self._send_json(404, {"detail": "Transaction not found"})
+        elif segments[0] == "variable" and len(segments) == 3:
+            value = ledger.variables.get((segments[1], segments[2]))
+            if value is None:
+                self._send_json(404, {"detail": "Variable not found"})
+            else:
+                self._send_json(200, {"value": value})
+        elif segments[0] == "transactions":
+            rows = ledger.query(params)
+            if self.server.binary and pigeonium_wire.CONTENT_TYPE in self.headers.get("Accept", ""):
+                self._send_body(200, pigeonium_wire.encode_transactions(rows), pigeonium_wire.CONTENT_TYPE)
+            else:
+                self._send_json(200, rows)
+        else:
+            self._send_json(404, {"detail": "Not found"})
+
+    def do_POST(self) -> None:
+        self._delay()
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        ledger = self.server.ledger
+        if self.path == "/transaction":
+            self._send_json(200, ledger.append(payload))
+        elif self.path == "/contract":
+            self._send_json(200, ledger.append(dict(payload["deployTransaction"], isContract=True)))
+        else:
+            self._send_json(404, {"detail": "Not found"})
+
+class MockPigeoniumServer(ThreadingHTTPServer):
+    """
+    バックグラウンドスレッドで動くモックAPIサーバー。
+
+    使用例:
+        with MockPigeoniumServer(transactions=10000, latency=0.005) as server:
+            client = PigeoniumClient(server.url)
+    """
+
+    daemon_threads = True
+    handler_class = MockRequestHandler
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        transactions: int = 1000,
+        addresses: int = 100,
+        input_bytes: int = 0,
+        latency: float = 0.0,
+        contract_deploy_cost: int = 1000,
+        compression: bool = True,
+        binary: bool = True
+    ):
+        super().__init__((host, port), self.handler_class)
+        self.ledger = MockLedger(transactions, addresses, input_bytes)
+        self.latency = latency
+        self.contract_deploy_cost = contract_deploy_cost
+        self.compression = compression
+        self.binary = binary
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def network_info(self) -> Dict[str, Any]:
+        return {
+            "networkName": "MockNet",
+            "networkId": 0,
+            "contractDeployCost": self.contract_deploy_cost,
+            "adminPublicKey": (b"\x02" + ADMIN_ADDRESS * 4)[:64].hex(),
+            "baseCurrency": self.ledger.currencies[BASE_CURRENCY_ID],
+        }
+
+    def start(self) -> "MockPigeoniumServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockPigeoniumServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pigeonium API mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=14540)
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--addresses", type=int, default=100)
+    parser.add_argument("--input-bytes", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-compression", action="store_true", help="レスポンスを圧縮しない")
+    parser.add_argument("--no-binary", action="store_true", help="バイナリ形式に対応しない(常にJSONで返す)")
+    args = parser.parse_args()
+    server = MockPigeoniumServer(args.host, args.port, args.transactions, args.addresses,
+                                 args.input_bytes, args.latency_ms / 1000,
+                                 compression=not args.no_compression, binary=not args.no_binary)
+    print(f"serving on {server.url} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
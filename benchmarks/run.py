@@ -0,0 +1,226 @@
+"""
+ローカルのモックAPIサーバーに対するクライアントのベンチマーク。
+結果はJSONで出力されるため、実行ごとに比較できます。
+
+    python -m benchmarks.run --transactions 20000 --latency-ms 2 --output bench_output.txt
+"""
+import argparse
+import gzip
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Tuple
+
+import pigeonium
+import pigeonium_wire
+from benchmarks.mock_server import MockPigeoniumServer, zstandard
+from pigeonium_batch import TransactionBatch
+from pigeonium_client import PigeoniumClient
+from pigeonium_metrics import ClientMetrics
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def _latency_summary(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+    }
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    """fnの実行中に確保されたPythonオブジェクトのピークメモリ(バイト)。"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _decode_cost(metrics: ClientMetrics, endpoint: str = "/transactions") -> Dict[str, float]:
+    decode = metrics.snapshot()["decode"].get(endpoint)
+    if not decode or not decode["transactions"]:
+        return {"decode_us_per_tx": 0.0}
+    return {"decode_us_per_tx": decode["sum"] / decode["transactions"] * 1e6}
+
+def bench_get_transactions(client: PigeoniumClient, metrics: ClientMetrics, iterations: int, limit: int) -> Dict[str, Any]:
+    metrics.reset()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        client.get_transactions(limit=limit, offset=(i * limit) % 1000)
+        latencies.append(time.perf_counter() - t)
+    result = _latency_summary(latencies, time.perf_counter() - start)
+    result.update(_decode_cost(metrics))
+    result["limit"] = limit
+    result["peak_memory_bytes"] = _peak_memory(lambda: client.get_transactions(limit=limit))
+    return result
+
+def bench_iterable_scan(client: PigeoniumClient, metrics: ClientMetrics, page_size: int, prefetch: int) -> Dict[str, Any]:
+    def scan() -> int:
+        return sum(1 for _ in client.IterableTransaction(sort_order="ASC", page_size=page_size, prefetch=prefetch))
+
+    metrics.reset()
+    start = time.perf_counter()
+    count = scan()
+    elapsed = time.perf_counter() - start
+    result = {
+        "transactions": count,
+        "elapsed_s": elapsed,
+        "transactions_per_s": count / elapsed if elapsed else 0.0,
+        "page_size": page_size,
+        "prefetch": prefetch,
+    }
+    result.update(_decode_cost(metrics))
+    result["peak_memory_bytes"] = _peak_memory(scan)
+    return result
+
+def bench_send_transactions(client: PigeoniumClient, metrics: ClientMetrics, count: int, concurrency: int) -> Dict[str, Any]:
+    wallet = client.generate_wallet()
+    dest = client.generate_wallet().address
+    base_currency_id = client.config.base_currency.currencyId
+    metrics.reset()
+
+    def send(i: int) -> float:
+        t = time.perf_counter()
+        client.send_transaction(wallet, dest, base_currency_id, 1 + i)
+        return time.perf_counter() - t
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(send, range(count)))
+    result = _latency_summary(latencies, time.perf_counter() - start)
+    result["concurrency"] = concurrency
+    signing = metrics.snapshot()["signing"].get("send_transaction")
+    result["signing_us_per_tx"] = signing["sum"] / signing["count"] * 1e6 if signing else 0.0
+    return result
+
+def bench_deploy_contract(client: PigeoniumClient, metrics: ClientMetrics, count: int) -> Dict[str, Any]:
+    wallet = client.generate_wallet()
+    metrics.reset()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        client.deploy_contract(wallet, f"if transaction.inputData: setVariable(transaction.inputData, b'{i}')")
+        latencies.append(time.perf_counter() - t)
+    result = _latency_summary(latencies, time.perf_counter() - start)
+    signing = metrics.snapshot()["signing"].get("deploy_contract")
+    result["signing_us_per_deploy"] = signing["sum"] / signing["count"] * 1e6 if signing else 0.0
+    return result
+
+def bench_wire_formats(server: MockPigeoniumServer, limit: int, iterations: int) -> Dict[str, Any]:
+    """
+    同じページをJSONとバイナリ形式、無圧縮・gzip・zstdで表したときの、1件あたりのバイト数とデコード時間。
+    decode_us_per_tx は展開から TransactionBatch を作るまで、
+    objects_us_per_tx は展開から pigeonium.Transaction のリストを作るまで(as_batch=False の場合)の時間です。
+    """
+    rows = server.ledger.query({"limit": str(limit), "sort_order": "ASC"})
+    formats: Dict[str, Callable[[bytes], TransactionBatch]] = {
+        "json": lambda body: TransactionBatch.from_hex_dicts(json.loads(body)),
+        "binary": pigeonium_wire.decode_transactions,
+    }
+    objects: Dict[str, Callable[[bytes], List[pigeonium.Transaction]]] = {
+        "json": lambda body: [pigeonium.Transaction.fromHexDict(row) for row in json.loads(body)],
+        "binary": lambda body: pigeonium_wire.decode_transactions(body).to_list(),
+    }
+    bodies = {
+        "json": json.dumps(rows, separators=(",", ":")).encode(),
+        "binary": pigeonium_wire.encode_transactions(rows),
+    }
+    codecs: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+        "identity": (lambda b: b, lambda b: b),
+        "gzip": (lambda b: gzip.compress(b, compresslevel=6), gzip.decompress),
+    }
+    if zstandard is not None:
+        codecs["zstd"] = (zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress)
+    results = {}
+    for name, decode in formats.items():
+        for encoding, (compress, decompress) in codecs.items():
+            payload = compress(bodies[name])
+            result = {"bytes_per_tx": len(payload) / len(rows)}
+            for key, fn in (("decode_us_per_tx", decode), ("objects_us_per_tx", objects[name])):
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    fn(decompress(payload))
+                result[key] = (time.perf_counter() - start) / iterations / len(rows) * 1e6
+            results[f"{name}+{encoding}"] = result
+    return {"transactions": len(rows), "formats": results}
+
+def bench_wire_end_to_end(server: MockPigeoniumServer, limit: int, iterations: int) -> Dict[str, Any]:
+    """wire_formatごとに get_transactions(as_batch=True) を呼び、受信したバイト数と応答時間を比べます。"""
+    results = {}
+    for wire_format in ("json", "binary"):
+        metrics = ClientMetrics()
+        client = PigeoniumClient(server.url, hooks=[metrics], wire_format=wire_format)
+        latencies = []
+        start = time.perf_counter()
+        for i in range(iterations):
+            t = time.perf_counter()
+            client.get_transactions(limit=limit, offset=(i * limit) % 1000, as_batch=True)
+            latencies.append(time.perf_counter() - t)
+        result = _latency_summary(latencies, time.perf_counter() - start)
+        received = metrics.snapshot()["requests"]["GET /transactions"]["bytes_received"]
+        result["bytes_per_tx"] = received / (iterations * limit)
+        results[wire_format] = result
+    return results
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with MockPigeoniumServer(
+        transactions=args.transactions,
+        input_bytes=args.input_bytes,
+        latency=args.latency_ms / 1000
+    ) as server:
+        metrics = ClientMetrics()
+        client = PigeoniumClient(server.url, hooks=[metrics], pool_maxsize=max(args.concurrency, 10))
+        results = {
+            "get_transactions": bench_get_transactions(client, metrics, args.iterations, args.limit),
+            "iterable_scan": bench_iterable_scan(client, metrics, args.page_size, args.prefetch),
+            "send_transaction_burst": bench_send_transactions(client, metrics, args.sends, args.concurrency),
+            "deploy_contract": bench_deploy_contract(client, metrics, args.deploys),
+            "wire_formats": bench_wire_formats(server, args.limit * 10, args.iterations // 10 or 1),
+            "wire_end_to_end": bench_wire_end_to_end(server, args.limit, args.iterations),
+        }
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pigeonium client benchmarks")
+    parser.add_argument("--transactions", type=int, default=10000, help="モックサーバーに用意するトランザクション数")
+    parser.add_argument("--input-bytes", type=int, default=0, help="各トランザクションのinputDataのバイト数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="モックサーバーの応答遅延")
+    parser.add_argument("--iterations", type=int, default=200, help="get_transactionsの呼び出し回数")
+    parser.add_argument("--limit", type=int, default=100, help="get_transactionsのlimit")
+    parser.add_argument("--page-size", type=int, default=500, help="IterableTransactionのpage_size")
+    parser.add_argument("--prefetch", type=int, default=1, help="IterableTransactionのprefetch")
+    parser.add_argument("--sends", type=int, default=500, help="send_transactionの送信数")
+    parser.add_argument("--concurrency", type=int, default=8, help="send_transactionの同時送信数")
+    parser.add_argument("--deploys", type=int, default=20, help="deploy_contractの回数")
+    parser.add_argument("--output", help="結果を書き込むファイル。省略時は標準出力")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
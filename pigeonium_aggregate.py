@@ -0,0 +1,140 @@
+import heapq
+import pigeonium
+from itertools import repeat
+from typing import Dict, List, Any, Iterable, Sequence, Tuple
+
+from pigeonium_batch import TransactionBatch
+
+class TransactionAggregate:
+    """
+    トランザクションをグループごとに集計します。
+    各グループについて件数と、amount・feeAmount それぞれの合計・最小・最大を保持します。
+    保持するのはグループごとの集計値だけなので、メモリ使用量は件数ではなくグループ数に比例します。
+    add() はページ単位で受け取り、TransactionBatch の場合は pigeonium.Transaction を作らずに列を直接走査します。
+    同じ設定の集計同士は merge() で合算できるため、区間ごとに集計した結果をまとめることができます。
+
+    使用例:
+        volume = TransactionAggregate(group_by=("currencyId", "time"), bucket=3600)
+        volume.consume(client.scan_transactions(start, end, as_batch=True))
+        for row in volume.results():
+            print(row["currencyId"].hex(), row["time"], row["amount_sum"])
+    """
+
+    GROUP_FIELDS = ("currencyId", "source", "dest", "time")
+    STATS = ("count", "amount_sum", "amount_min", "amount_max", "feeAmount_sum", "feeAmount_min", "feeAmount_max")
+
+    def __init__(self, group_by: Sequence[str] = ("currencyId",), bucket: int = 3600):
+        """
+        Args:
+            group_by (Sequence[str]): グループ化する項目。"currencyId"・"source"・"dest"・"time" の組み合わせ。
+                空の場合は全体を1つのグループとして集計します。
+            bucket (int): "time" でグループ化する場合の時間の幅(秒)。timestampをこの幅で切り捨てます。
+        """
+        for name in group_by:
+            if name not in self.GROUP_FIELDS:
+                raise ValueError(f"unknown group_by field: {name}")
+        if bucket < 1:
+            raise ValueError("bucket must be at least 1")
+        self.group_by = tuple(group_by)
+        self.bucket = bucket
+        self.groups: Dict[Tuple, List[int]] = {}
+
+    def _key_column(self, page: Sequence[pigeonium.Transaction]|TransactionBatch, name: str) -> Sequence[Any]:
+        field = "timestamp" if name == "time" else name
+        if isinstance(page, TransactionBatch):
+            column = getattr(page, field)
+        else:
+            column = [getattr(tx, field) for tx in page]
+        if name == "time":
+            bucket = self.bucket
+            return [t - t % bucket for t in column]
+        return column
+
+    def add(self, page: Sequence[pigeonium.Transaction]|TransactionBatch) -> "TransactionAggregate":
+        """1ページ分のトランザクションを集計に加えます。"""
+        if not len(page):
+            return self
+        if isinstance(page, TransactionBatch):
+            amounts, fees = page.amount, page.feeAmount
+        else:
+            amounts = [tx.amount for tx in page]
+            fees = [tx.feeAmount for tx in page]
+        if self.group_by:
+            keys = zip(*(self._key_column(page, name) for name in self.group_by))
+        else:
+            keys = repeat(())
+        groups = self.groups
+        for key, amount, fee in zip(keys, amounts, fees):
+            stats = groups.get(key)
+            if stats is None:
+                groups[key] = [1, amount, amount, amount, fee, fee, fee]
+                continue
+            stats[0] += 1
+            stats[1] += amount
+            if amount < stats[2]:
+                stats[2] = amount
+            elif amount > stats[3]:
+                stats[3] = amount
+            stats[4] += fee
+            if fee < stats[5]:
+                stats[5] = fee
+            elif fee > stats[6]:
+                stats[6] = fee
+        return self
+
+    def consume(self, pages: Iterable[Sequence[pigeonium.Transaction]|TransactionBatch|pigeonium.Transaction]) -> "TransactionAggregate":
+        """
+        ページの列(as_batch=True の IterableTransaction や scan_transactions など)をすべて集計します。
+        1件ずつのトランザクションの列を渡した場合は、まとめてから集計します。
+        """
+        pending: List[pigeonium.Transaction] = []
+        for item in pages:
+            if isinstance(item, (TransactionBatch, list, tuple)):
+                self.add(item)
+                continue
+            pending.append(item)
+            if len(pending) >= 1024:
+                self.add(pending)
+                pending = []
+        if pending:
+            self.add(pending)
+        return self
+
+    def merge(self, other: "TransactionAggregate") -> "TransactionAggregate":
+        """otherの集計結果をこの集計に合算します。group_by と bucket が同じである必要があります。"""
+        if (other.group_by, other.bucket) != (self.group_by, self.bucket):
+            raise ValueError("cannot merge aggregates with different group_by or bucket")
+        groups = self.groups
+        for key, theirs in other.groups.items():
+            ours = groups.get(key)
+            if ours is None:
+                groups[key] = list(theirs)
+                continue
+            ours[0] += theirs[0]
+            ours[1] += theirs[1]
+            ours[2] = min(ours[2], theirs[2])
+            ours[3] = max(ours[3], theirs[3])
+            ours[4] += theirs[4]
+            ours[5] = min(ours[5], theirs[5])
+            ours[6] = max(ours[6], theirs[6])
+        return self
+
+    def _row(self, key: Tuple, stats: List[int]) -> Dict[str, Any]:
+        row: Dict[str, Any] = dict(zip(self.group_by, key))
+        row.update(zip(self.STATS, stats))
+        return row
+
+    def results(self) -> List[Dict[str, Any]]:
+        """グループごとの集計結果をグループのキーの順に返します。"""
+        return [self._row(key, stats) for key, stats in sorted(self.groups.items())]
+
+    def top(self, n: int = 10, by: str = "amount_sum") -> List[Dict[str, Any]]:
+        """
+        by の値が大きい順に n グループを返します。
+
+        Args:
+            n (int, optional): 返すグループの数。 Defaults to 10.
+            by (str, optional): 並べ替えに使う集計値(STATSのいずれか)。 Defaults to "amount_sum".
+        """
+        column = self.STATS.index(by)
+        return [self._row(key, stats) for key, stats in heapq.nlargest(n, self.groups.items(), key=lambda kv: kv[1][column])]
@@ -0,0 +1,348 @@
+import asyncio
+import aiohttp
+import pigeonium
+from typing import Optional, Dict, Literal, List, Any, AsyncIterator
+
+from pigeonium_batch import TransactionBatch
+from pigeonium_client import (
+    CurrencyCache,
+    NetworkConfig,
+    _read_network_cache,
+    _write_network_cache,
+    _currency_from_dict,
+    _currency_params,
+    _transaction_filter_params,
+    _next_poll_interval,
+    _transaction_payload,
+    _contract_payload,
+)
+
+def _sign_with(config: NetworkConfig, sign, *args) -> Any:
+    with config.activate():
+        return sign(*args)
+
+class AsyncPigeoniumClient:
+    """
+    PigeoniumClientのasyncio版。
+    コネクションプールを共有し、1プロセスから多数のリクエストを同時に発行できます。
+
+    使用例:
+        async with AsyncPigeoniumClient(API_URL) as client:
+            bals = await asyncio.gather(*(client.get_balances(a) for a in addresses))
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:14540",
+        pool_size: int = 100,
+        per_host_limit: int = 100,
+        timeout: Optional[float] = None,
+        currency_cache: Optional[CurrencyCache] = None,
+        network_cache_path: Optional[str] = None,
+        network_cache_ttl: float = 3600.0
+    ):
+        """
+        AsyncPigeoniumClientを初期化します。
+        ネットワーク情報は最初に必要になった時点(または connect() 呼び出し時)に取得され、クライアントごとに保持されます。
+
+        Args:
+            base_url (str): Pigeonium APIサーバーのベースURL。
+            pool_size (int): コネクションプール全体の最大接続数。
+            per_host_limit (int): ホストごとの最大同時接続数。
+            timeout (Optional[float]): リクエスト全体のタイムアウト秒数。Noneで無制限。
+            currency_cache (Optional[CurrencyCache]): get_currencyが使うキャッシュ。Noneの場合は既定の設定で作成します。
+            network_cache_path (Optional[str]): ネットワーク情報を保存するJSONファイルのパス。Noneでファイルに保存しません。
+            network_cache_ttl (float): キャッシュファイルのネットワーク情報の有効期間(秒)。
+        """
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.currency_cache = currency_cache if currency_cache is not None else CurrencyCache()
+        self.network_cache_path = network_cache_path
+        self.network_cache_ttl = network_cache_ttl
+        self.config: Optional[NetworkConfig] = None
+        self._connect_lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncPigeoniumClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # ClientSessionは実行中のイベントループ上で作成する必要があるため、初回利用時に作成します。
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host_limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    @property
+    def network_info(self) -> Optional[Dict[str, str|int|Dict]]:
+        """サーバーから取得したネットワーク情報。未取得の場合はNone。"""
+        return self.config.network_info if self.config is not None else None
+
+    async def connect(self) -> NetworkConfig:
+        """
+        ネットワーク情報をキャッシュファイルまたはサーバーから取得し、このクライアントの設定として保持します。
+        同時に呼ばれた場合も、取得は1回だけ行います。
+        """
+        if self.config is None:
+            async with self._connect_lock:
+                if self.config is None:
+                    network_info = _read_network_cache(self.network_cache_path, self.base_url, self.network_cache_ttl)
+                    if network_info is None:
+                        network_info = await self._get("/")
+                        _write_network_cache(self.network_cache_path, self.base_url, network_info)
+                    self.config = NetworkConfig(network_info)
+        return self.config
+
+    async def _sign(self, sign, *args) -> Any:
+        """
+        このクライアントのネットワーク設定を反映した状態で sign(*args) を実行します。
+        pigeonium.Config のロックは他のスレッドの署名中に待たされることがあるため、イベントループを止めないようスレッドプールで実行します。
+        """
+        config = await self.connect()
+        return await asyncio.get_running_loop().run_in_executor(None, _sign_with, config, sign, *args)
+
+    async def close(self) -> None:
+        """コネクションプールを閉じます。"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Any:
+        session = self._get_session()
+        async with session.request(method, f"{self.base_url}{endpoint}", **kwargs) as response:
+            if response.status >= 400:
+                text = await response.text()
+                print(f"{response.status}: {text}")
+                response.raise_for_status()
+            return await response.json()
+
+    async def _post(self, endpoint: str, json_data: Dict[str, Any]) -> Dict[str, str|int]:
+        return await self._request("POST", endpoint, json=json_data)
+
+    async def _get(self, endpoint: str, params: dict={}) -> Any:
+        # aiohttpはbool値をクエリに渡せないため、requestsと同じ "True"/"False" 表記に変換します。
+        params = {k: str(v) if isinstance(v, bool) else v for k, v in params.items()}
+        return await self._request("GET", endpoint, params=params)
+
+    @staticmethod
+    def generate_wallet() -> pigeonium.Wallet:
+        """
+        新しいPigeoniumウォレットを生成します。
+        """
+        return pigeonium.Wallet.generate()
+
+    @staticmethod
+    def wallet_from_private_key(private_key_hex: str) -> pigeonium.Wallet:
+        """
+        16進数文字列の秘密鍵からウォレットを復元します。
+        """
+        return pigeonium.Wallet.fromPrivate(bytes.fromhex(private_key_hex))
+
+    async def get_balance(self, address: bytes, currency_id: bytes) -> int:
+        """
+        指定されたアドレスの単一の通貨残高を取得します。
+        """
+        result = await self._get(f"/balance/{address.hex()}/{currency_id.hex()}")
+        return result.get('amount', 0)
+
+    async def get_balances(self, address: bytes) -> Dict[bytes, int]:
+        """
+        指定されたアドレスの通貨残高を取得します。
+        """
+        result = await self._get(f"/balances/{address.hex()}")
+        return {bytes.fromhex(cu_id): amount for cu_id, amount in result.items()}
+
+    async def get_currency(
+        self,
+        currency_id: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> pigeonium.Currency|None:
+        """
+        通貨情報を取得します。キャッシュの扱いは PigeoniumClient.get_currency と同じです。
+        """
+        state, cached = self.currency_cache.lookup(currency_id, name, symbol, issuer)
+        if state == CurrencyCache.HIT:
+            return cached
+        if state == CurrencyCache.NOT_FOUND:
+            return None
+        params = _currency_params(currency_id, name, symbol, issuer)
+        # supplyの更新に失敗した場合は、期限切れのキャッシュをそのまま返します。
+        fallback = None
+        if state == CurrencyCache.STALE:
+            params = {"currencyId": cached.currencyId.hex()}
+            fallback = cached
+        try:
+            response = await self._get(f"/currency", params)
+        except asyncio.CancelledError:
+            raise
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                self.currency_cache.put_not_found(currency_id, name, symbol, issuer)
+                return None
+            return fallback
+        except:
+            return fallback
+        if not response:
+            self.currency_cache.put_not_found(currency_id, name, symbol, issuer)
+            return None
+        try:
+            cu = _currency_from_dict(response)
+        except:
+            return fallback
+        self.currency_cache.put(cu)
+        return cu
+
+    async def warm_currency_cache(self, balances: Dict[bytes, int]) -> Dict[bytes, pigeonium.Currency|None]:
+        """
+        get_balancesの結果に含まれる通貨のうち、キャッシュにないものを同時に取得します。
+        """
+        cu_ids = list(balances)
+        currencies = await asyncio.gather(*(self.get_currency(cu_id) for cu_id in cu_ids))
+        return dict(zip(cu_ids, currencies))
+
+    async def get_transaction(self, index_id: int) -> Optional[pigeonium.Transaction]:
+        """
+        指定されたインデックスIDのトランザクションを取得します。
+
+        Args:
+            index_id (int): トランザクションのインデックスID。
+
+        Returns:
+            Optional[pigeonium.Transaction]: トランザクション情報。見つからない場合はNone。
+        """
+        try:
+            response = await self._get(f"/transaction/{index_id}")
+            if response:
+                return pigeonium.Transaction.fromHexDict(response)
+            return None
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                return None
+            raise e
+
+    async def get_transactions(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        indexId_start: Optional[int] = None,
+        indexId_end: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        is_contract: Optional[bool] = None,
+        sort_by: Literal["indexId", "timestamp", "amount", "feeAmount"] = "indexId",
+        sort_order: Literal["ASC", "DESC"] = "DESC",
+        limit: int = 20,
+        offset: int = 0,
+        as_batch: bool = False
+    ) -> List[pigeonium.Transaction]|TransactionBatch:
+        """
+        条件に一致するトランザクションを取得します。
+        as_batch=True の場合は、列ごとにまとめた TransactionBatch を返します。
+        """
+        params = {
+            "limit": limit,
+            "offset": offset,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+        }
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            indexId_start, indexId_end, timestamp_start, timestamp_end, is_contract
+        ))
+
+        response = await self._get("/transactions", params=params)
+        if as_batch:
+            return TransactionBatch.from_hex_dicts(response)
+        return [pigeonium.Transaction.fromHexDict(tx) for tx in response]
+
+    async def watch_transactions(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        indexId_start: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        is_contract: Optional[bool] = None,
+        page_size: int = 100,
+        min_interval: float = 0.2,
+        max_interval: float = 5.0,
+        backoff: float = 2.0
+    ) -> AsyncIterator[pigeonium.Transaction]:
+        """
+        新しいトランザクションを監視し、到着した順に1件ずつ返す非同期ジェネレータ。
+        引数と動作は PigeoniumClient.watch_transactions と同じです。終了するにはタスクをキャンセルしてください。
+        """
+        params = {
+            "limit": page_size,
+            "offset": 0,
+            "sort_by": "indexId",
+            "sort_order": "ASC",
+        }
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            timestamp_start=timestamp_start, timestamp_end=timestamp_end, is_contract=is_contract
+        ))
+        if indexId_start is None:
+            latest = await self._get("/transactions", {"limit": 1, "offset": 0, "sort_by": "indexId", "sort_order": "DESC"})
+            indexId_start = latest[0]['indexId'] + 1 if latest else 0
+        params["indexId_start"] = indexId_start
+
+        interval = min_interval
+        while True:
+            page = await self._get("/transactions", params=params)
+            for tx in page:
+                yield pigeonium.Transaction.fromHexDict(tx)
+            if page:
+                params["indexId_start"] = page[-1]['indexId'] + 1
+            interval = _next_poll_interval(interval, len(page), page_size, min_interval, max_interval, backoff)
+            if interval:
+                await asyncio.sleep(interval)
+
+    async def send_transaction(
+        self,
+        source_wallet: pigeonium.Wallet,
+        dest_address: bytes,
+        currency_id: bytes,
+        amount: int,
+        fee_amount: int = 0,
+        input_data: bytes = b''
+    ) -> pigeonium.Transaction:
+        """
+        通貨を送信するトランザクションを作成し、ネットワークにブロードキャストします。
+        引数は PigeoniumClient.send_transaction と同じです。
+        """
+        payload = await self._sign(_transaction_payload, source_wallet, dest_address, currency_id, amount, fee_amount, input_data)
+        response = await self._post("/transaction", payload)
+        return pigeonium.Transaction.fromHexDict(response)
+
+    async def deploy_contract(
+        self,
+        sender_wallet: pigeonium.Wallet,
+        script: str
+    ) -> pigeonium.Transaction:
+        """
+        スマートコントラクトをネットワークにデプロイします。
+        引数は PigeoniumClient.deploy_contract と同じです。
+        """
+        config = await self.connect()
+        payload = await self._sign(_contract_payload, sender_wallet, script, config)
+        response = await self._post("/contract", payload)
+        return pigeonium.Transaction.fromHexDict(response)
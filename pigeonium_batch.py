@@ -0,0 +1,206 @@
+import pigeonium
+from array import array
+from itertools import accumulate
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Tuple
+
+class BytesColumn:
+    """
+    バイト列の列を1つのバッファにまとめて保持する列。
+    全要素が同じ長さ(アドレスやIDの16バイトなど)の場合はオフセットを持たず、固定長として扱います。
+    """
+
+    __slots__ = ("buffer", "width", "offsets", "_length")
+
+    def __init__(self, buffer: bytes, length: int, width: Optional[int] = None, offsets: Optional[array] = None):
+        self.buffer = buffer
+        self.width = width
+        self.offsets = offsets
+        self._length = length
+
+    @classmethod
+    def from_hex(cls, values: List[str]) -> "BytesColumn":
+        """16進数文字列の列を1回のbytes.fromhexでまとめて変換します。"""
+        buffer = bytes.fromhex("".join(values))
+        if not values:
+            return cls(buffer, 0, width=0)
+        width = len(values[0]) // 2
+        if len(buffer) == width * len(values) and all(len(v) == width * 2 for v in values):
+            return cls(buffer, len(values), width=width)
+        offsets = array('Q', [0])
+        offsets.extend(accumulate(len(v) // 2 for v in values))
+        return cls(buffer, len(values), offsets=offsets)
+
+    @classmethod
+    def from_bytes(cls, values: List[bytes]) -> "BytesColumn":
+        """bytesの列から作成します。"""
+        if values and all(len(v) == len(values[0]) for v in values):
+            return cls(b"".join(values), len(values), width=len(values[0]))
+        offsets = array('Q', [0])
+        offsets.extend(accumulate(len(v) for v in values))
+        return cls(b"".join(values), len(values), offsets=offsets)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> bytes:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("BytesColumn index out of range")
+        if self.offsets is None:
+            return self.buffer[i * self.width:(i + 1) * self.width]
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.to_list())
+
+    def to_list(self) -> List[bytes]:
+        """すべての要素をbytesのリストにします。"""
+        buffer = self.buffer
+        if self.offsets is None:
+            width = self.width
+            if not width:
+                return [b""] * self._length
+            return [buffer[i:i + width] for i in range(0, self._length * width, width)]
+        offsets = self.offsets
+        return [buffer[offsets[i]:offsets[i + 1]] for i in range(self._length)]
+
+    def take(self, start: int, stop: int) -> "BytesColumn":
+        """start〜stop-1番目の要素からなる列。"""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        stop = max(start, stop)
+        if self.offsets is None:
+            return BytesColumn(self.buffer[start * self.width:stop * self.width], stop - start, width=self.width)
+        base = self.offsets[start]
+        offsets = array('Q', (offset - base for offset in self.offsets[start:stop + 1]))
+        return BytesColumn(self.buffer[base:self.offsets[stop]], stop - start, offsets=offsets)
+
+    def hex(self, i: int) -> str:
+        return self[i].hex()
+
+def _make_transaction(fields: Iterable[Tuple[str, Any]]) -> pigeonium.Transaction:
+    # fromHexDictと同じ属性を、16進数文字列を経由せずにbytesと整数のまま設定します。
+    tx = pigeonium.Transaction.__new__(pigeonium.Transaction)
+    for key, value in fields:
+        setattr(tx, key, value)
+    return tx
+
+def _int_column(values: List[Any]) -> array|List[Any]:
+    # 64ビットに収まらない値やNoneを含む列は、そのままのリストで保持します。
+    try:
+        return array('q', values)
+    except (OverflowError, TypeError):
+        return list(values)
+
+class TransactionBatch:
+    """
+    1ページ分のトランザクションを列ごとにまとめて保持するコンテナ。
+    整数の列はarray、アドレスやIDなどのバイト列はBytesColumnに格納するため、
+    1件ごとにpigeonium.Transactionを作るよりもメモリとGCの負担が小さくなります。
+    batch[i] でアクセスした時点で初めて、列のbytesと整数からpigeonium.Transactionを作成します。
+    """
+
+    INT_FIELDS = ("indexId", "amount", "feeAmount", "timestamp")
+    BYTES_FIELDS = ("source", "dest", "currencyId", "inputData", "publicKey", "signature")
+
+    def __init__(self, columns: Dict[str, array|List[Any]|BytesColumn], length: int, extra: Optional[Dict[str, List[Any]]] = None):
+        if not length:
+            # 空のページでも batch.amount などの列にアクセスできるよう、既知の列を空で用意します。
+            columns = dict(columns)
+            for key in self.INT_FIELDS:
+                columns.setdefault(key, array('q'))
+            for key in self.BYTES_FIELDS:
+                columns.setdefault(key, BytesColumn(b"", 0, width=0))
+        self.columns = columns
+        self.extra = extra or {}
+        self._length = length
+
+    @classmethod
+    def from_hex_dicts(cls, rows: List[Dict[str, Any]]) -> "TransactionBatch":
+        """APIが返す形式(16進数文字列の辞書)のリストを列ごとに一括で変換します。"""
+        columns: Dict[str, array|List[Any]|BytesColumn] = {}
+        extra: Dict[str, List[Any]] = {}
+        keys = rows[0].keys() if rows else ()
+        for key in keys:
+            values = [row.get(key) for row in rows]
+            if key in cls.INT_FIELDS:
+                columns[key] = _int_column(values)
+            elif key in cls.BYTES_FIELDS:
+                columns[key] = BytesColumn.from_hex(values)
+            else:
+                extra[key] = values
+        return cls(columns, len(rows), extra)
+
+    @classmethod
+    def concat(cls, batches: Iterable["TransactionBatch"]) -> "TransactionBatch":
+        """複数のバッチを1つに連結します。"""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls({}, 0)
+        columns: Dict[str, array|List[Any]|BytesColumn] = {}
+        for key, first in batches[0].columns.items():
+            if isinstance(first, BytesColumn):
+                columns[key] = BytesColumn.from_bytes([v for b in batches for v in b.columns[key]])
+            else:
+                columns[key] = _int_column([v for b in batches for v in b.columns[key]])
+        extra = {key: [v for b in batches for v in b.extra[key]] for key in batches[0].extra}
+        return cls(columns, sum(len(b) for b in batches), extra)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def take(self, start: int, stop: int) -> "TransactionBatch":
+        """start〜stop-1番目のトランザクションからなるバッチ。列のバッファを切り出すだけで、行の変換は行いません。"""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        stop = max(start, stop)
+        columns = {
+            key: column.take(start, stop) if isinstance(column, BytesColumn) else column[start:stop]
+            for key, column in self.columns.items()
+        }
+        extra = {key: column[start:stop] for key, column in self.extra.items()}
+        return TransactionBatch(columns, stop - start, extra)
+
+    def __getattr__(self, name: str):
+        # batch.amount や batch.source のように列へ直接アクセスできるようにします。
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            pass
+        try:
+            return self.__dict__['extra'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def row_dict(self, i: int) -> Dict[str, Any]:
+        """i番目のトランザクションをAPIと同じ形式(16進数文字列の辞書)で返します。"""
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("TransactionBatch index out of range")
+        row = {}
+        for key, column in self.columns.items():
+            row[key] = column.hex(i) if isinstance(column, BytesColumn) else column[i]
+        for key, column in self.extra.items():
+            row[key] = column[i]
+        return row
+
+    def __getitem__(self, i: int|slice) -> pigeonium.Transaction|List[pigeonium.Transaction]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("TransactionBatch index out of range")
+        fields = [(key, column[i]) for key, column in self.columns.items()]
+        fields += [(key, column[i]) for key, column in self.extra.items()]
+        return _make_transaction(fields)
+
+    def __iter__(self) -> Iterator[pigeonium.Transaction]:
+        return iter(self.to_list())
+
+    def to_list(self) -> List[pigeonium.Transaction]:
+        """すべての行をpigeonium.Transactionに変換します。列ごとにまとめて取り出すため、batch[i] を繰り返すより高速です。"""
+        names = list(self.columns) + list(self.extra)
+        values = [column.to_list() if isinstance(column, BytesColumn) else column for column in self.columns.values()]
+        values += list(self.extra.values())
+        return [_make_transaction(zip(names, row)) for row in zip(*values)]
@@ -1,50 +1,803 @@
+import codecs
+import copy
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
 import requests
 import pigeonium
-from typing import Optional, Dict, Literal, List, Any
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Literal, List, Any, Deque, Iterable, Iterator, Tuple
+
+from pigeonium_batch import TransactionBatch
+from pigeonium_metrics import ClientHook, RequestEvent
+import pigeonium_wire
+from pigeonium_verify import SignatureVerifier, SignatureBitmap, InvalidSignatureError, verify_transactions
+
+_config_lock = threading.RLock()
+_active_config: Optional["NetworkConfig"] = None
+
+class NetworkConfig:
+    """
+    クライアントごとのネットワーク設定。
+    pigeonium.Config はプロセス全体で共有されるため、各クライアントは自分の設定をこのオブジェクトに保持し、
+    pigeonium.Config を参照する署名処理の間だけ activate() で反映します。
+    """
+
+    def __init__(self, network_info: Dict[str, Any]):
+        self.network_info = network_info
+        self.network_name: str = network_info['networkName']
+        self.network_id: int = network_info['networkId']
+        self.contract_deploy_cost: int = network_info['contractDeployCost']
+        self.admin_public_key: bytes = bytes.fromhex(network_info['adminPublicKey'])
+        self.base_currency: pigeonium.Currency = _currency_from_dict(network_info['baseCurrency'])
+
+    def apply(self) -> None:
+        """この設定をローカルのpigeonium.Configに反映します。"""
+        global _active_config
+        with _config_lock:
+            pigeonium.Config.NetworkName = self.network_name
+            pigeonium.Config.NetworkId = self.network_id
+            pigeonium.Config.ContractDeployCost = self.contract_deploy_cost
+            pigeonium.Config.AdminPublicKey = self.admin_public_key
+            pigeonium.Config.BaseCurrency = copy.copy(self.base_currency)
+            _active_config = self
+
+    @contextmanager
+    def activate(self):
+        """
+        ブロック内でこの設定がpigeonium.Configに反映されていることを保証します。
+        別ネットワークのクライアントが同時に署名しても設定が混ざらないよう、ブロックの間はロックを保持します。
+        """
+        with _config_lock:
+            if _active_config is not self:
+                self.apply()
+            yield self
+
+def _read_network_cache(path: Optional[str], base_url: str, ttl: float) -> Optional[Dict[str, Any]]:
+    """キャッシュファイルからbase_urlのネットワーク情報を読み込みます。期限切れや読み込めない場合はNone。"""
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f).get(base_url)
+    except (OSError, ValueError):
+        return None
+    if not entry or time.time() - entry.get('fetchedAt', 0) >= ttl:
+        return None
+    return entry.get('networkInfo')
+
+def _write_network_cache(path: Optional[str], base_url: str, network_info: Dict[str, Any]) -> None:
+    """ネットワーク情報をキャッシュファイルに保存します。書き込めない場合は何もしません。"""
+    if not path:
+        return
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        entries = {}
+    entries[base_url] = {'fetchedAt': time.time(), 'networkInfo': network_info}
+    try:
+        _write_json_atomic(path, entries)
+    except OSError:
+        pass
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    """一時ファイルに書いてから置き換えることで、途中で中断しても壊れたファイルを残さないようにします。"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _currency_from_dict(currency_info: Dict[str, Any]) -> pigeonium.Currency:
+    """APIの通貨情報(16進数文字列)からpigeonium.Currencyを組み立てます。"""
+    cu = pigeonium.Currency()
+    cu.currencyId = bytes.fromhex(currency_info['currencyId'])
+    cu.name = currency_info['name']
+    cu.symbol = currency_info['symbol']
+    cu.issuer = bytes.fromhex(currency_info['issuer'])
+    cu.supply = currency_info['supply']
+    return cu
+
+def _currency_params(
+    currency_id: Optional[bytes] = None,
+    name: Optional[str] = None,
+    symbol: Optional[str] = None,
+    issuer: Optional[bytes] = None
+) -> Dict[str, str]:
+    """/currency のクエリパラメータを組み立てます。"""
+    if currency_id:
+        return {"currencyId": currency_id.hex()}
+    elif name:
+        return {"name": name}
+    elif symbol:
+        return {"symbol": symbol}
+    elif issuer:
+        return {"issuer": issuer.hex()}
+    return {}
+
+def _transaction_filter_params(
+    address: Optional[bytes] = None,
+    source: Optional[bytes] = None,
+    dest: Optional[bytes] = None,
+    currencyId: Optional[bytes] = None,
+    amount_min: Optional[int] = None,
+    amount_max: Optional[int] = None,
+    indexId_start: Optional[int] = None,
+    indexId_end: Optional[int] = None,
+    timestamp_start: Optional[int] = None,
+    timestamp_end: Optional[int] = None,
+    is_contract: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """/transactions の絞り込み条件をクエリパラメータに変換します。"""
+    params = {}
+    if address:
+        params["address"] = address.hex()
+    if source:
+        params["source"] = source.hex()
+    if dest:
+        params["dest"] = dest.hex()
+    if currencyId:
+        params["currencyId"] = currencyId.hex()
+    if amount_min is not None:
+        params["amount_min"] = amount_min
+    if amount_max is not None:
+        params["amount_max"] = amount_max
+    if indexId_start is not None:
+        params["indexId_start"] = indexId_start
+    if indexId_end is not None:
+        params["indexId_end"] = indexId_end
+    if timestamp_start is not None:
+        params["timestamp_start"] = timestamp_start
+    if timestamp_end is not None:
+        params["timestamp_end"] = timestamp_end
+    if is_contract is not None:
+        params["is_contract"] = is_contract
+    return params
+
+def _transaction_payload(
+    source_wallet: pigeonium.Wallet,
+    dest_address: bytes,
+    currency_id: bytes,
+    amount: int,
+    fee_amount: int = 0,
+    input_data: bytes = b''
+) -> Dict[str, str|int]:
+    """トランザクションに署名し、POST /transaction のペイロードを作成します。"""
+    tx = pigeonium.Transaction.create(
+        source=source_wallet,
+        dest=bytes.fromhex(dest_address.hex()),
+        currencyId=bytes.fromhex(currency_id.hex()),
+        amount=amount,
+        feeAmount=fee_amount,
+        inputData=input_data
+    )
+    return {
+        "source": source_wallet.address.hex(),
+        "dest": dest_address.hex(),
+        "currencyId": currency_id.hex(),
+        "amount": amount,
+        "feeAmount": fee_amount,
+        "inputData": input_data.hex(),
+        "publicKey": source_wallet.publicKey.hex(),
+        "signature": tx.signature.hex(),
+    }
+
+def _contract_payload(sender_wallet: pigeonium.Wallet, script: str, config: NetworkConfig) -> Dict[str, Any]:
+    """コントラクトとデプロイトランザクションに署名し、POST /contract のペイロードを作成します。"""
+    contract = pigeonium.Contract(script)
+    base_currency_id = config.base_currency.currencyId
+
+    deploy_tx = pigeonium.Transaction.create(
+        source=sender_wallet,
+        dest=bytes(16),
+        currencyId=base_currency_id,
+        amount=contract.deployCost,
+        feeAmount=0,
+        inputData=contract.address
+    )
+
+    script_hash = pigeonium.Utils.sha3_256(script.encode())
+    script_signature = sender_wallet.sign(script_hash)
+
+    return {
+        "sender": sender_wallet.address.hex(),
+        "script": script,
+        "publicKey": sender_wallet.publicKey.hex(),
+        "signature": script_signature.hex(),
+        "deployTransaction": {
+            "source": sender_wallet.address.hex(),
+            "dest": "00" * 16,
+            "currencyId": base_currency_id.hex(),
+            "amount": contract.deployCost,
+            "feeAmount": 0,
+            "inputData": contract.address.hex(),
+            "publicKey": sender_wallet.publicKey.hex(),
+            "signature": deploy_tx.signature.hex(),
+        }
+    }
+
+class TransactionResult:
+    """send_transactionsの1件分の結果。成功時はtransaction、失敗時はerrorが設定されます。"""
+
+    __slots__ = ("transaction", "error")
+
+    def __init__(self, transaction: Optional[pigeonium.Transaction] = None, error: Optional[BaseException] = None):
+        self.transaction = transaction
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.ok:
+            return f"TransactionResult(indexId={getattr(self.transaction, 'indexId', None)})"
+        return f"TransactionResult(error={self.error!r})"
+
+def _init_signing_worker(network_info: Optional[Dict[str, Any]]) -> None:
+    """署名用ワーカープロセスのpigeonium.Configを親プロセスと同じネットワークに合わせます。"""
+    if network_info is not None:
+        NetworkConfig(network_info).apply()
+
+def _sign_payloads(items: List[Tuple[bytes, bytes, bytes, int, int, bytes]]) -> Tuple[List[Dict[str, str|int]|Exception], float]:
+    """
+    (秘密鍵, 宛先, 通貨ID, 送信量, 手数料, 追加データ) のリストに署名し、署名結果と署名にかかった時間(秒)を返します。
+    1件の失敗で他の署名が止まらないよう、例外は戻り値として返します。
+    ワーカープロセスは使い回されるため、秘密鍵から作ったウォレットはこの呼び出しの間だけ保持します。
+    """
+    start = time.perf_counter()
+    wallets: Dict[bytes, pigeonium.Wallet] = {}
+    signed = []
+    for private_key, dest_address, currency_id, amount, fee_amount, input_data in items:
+        try:
+            wallet = wallets.get(private_key)
+            if wallet is None:
+                wallet = wallets[private_key] = pigeonium.Wallet.fromPrivate(private_key)
+            signed.append(_transaction_payload(wallet, dest_address, currency_id, amount, fee_amount, input_data))
+        except Exception as e:
+            signed.append(e)
+    return signed, time.perf_counter() - start
+
+class CurrencyCache:
+    """
+    通貨情報のLRUキャッシュ。
+    currencyIdをキーに保持し、name・symbol・issuerからも引けるように索引を持ちます。
+    currencyId・name・symbol・issuerは変化しないため無期限に保持し、
+    supplyのみ supply_ttl 秒を過ぎると期限切れとして再取得の対象になります。
+    見つからなかった検索条件は negative_ttl 秒の間だけ「存在しない」として記憶します。
+    スレッドセーフです。max_size=0 でキャッシュを無効にできます。
+    """
+
+    HIT = "hit"
+    MISS = "miss"
+    STALE = "stale"
+    NOT_FOUND = "not_found"
+
+    def __init__(self, max_size: int = 1024, supply_ttl: Optional[float] = 60.0, negative_ttl: float = 5.0):
+        """
+        Args:
+            max_size (int): 保持する通貨の最大数。
+            supply_ttl (Optional[float]): supplyの有効期間(秒)。Noneで無期限。
+            negative_ttl (float): 「存在しない」結果の有効期間(秒)。
+        """
+        self.max_size = max_size
+        self.supply_ttl = supply_ttl
+        self.negative_ttl = negative_ttl
+        self._currencies: "OrderedDict[bytes, Tuple[pigeonium.Currency, float]]" = OrderedDict()
+        self._index: Dict[Tuple[str, Any], bytes] = {}
+        self._not_found: Dict[Tuple[str, Any], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(
+        currency_id: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> Optional[Tuple[str, Any]]:
+        # get_currencyと同じ優先順位で検索条件を1つ選びます。
+        if currency_id:
+            return ("currencyId", currency_id)
+        elif name:
+            return ("name", name)
+        elif symbol:
+            return ("symbol", symbol)
+        elif issuer:
+            return ("issuer", issuer)
+        return None
+
+    def lookup(
+        self,
+        currency_id: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> Tuple[str, Optional[pigeonium.Currency]]:
+        """
+        キャッシュを検索します。
+
+        Returns:
+            Tuple[str, Optional[pigeonium.Currency]]: (状態, 通貨情報のコピー)。
+            状態は HIT, STALE (supplyが期限切れ), NOT_FOUND (存在しないことが記憶済み), MISS のいずれか。
+        """
+        key = self._key(currency_id, name, symbol, issuer)
+        if key is None:
+            return self.MISS, None
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._not_found.get(key)
+            if expires_at is not None:
+                if now < expires_at:
+                    return self.NOT_FOUND, None
+                del self._not_found[key]
+            cu_id = key[1] if key[0] == "currencyId" else self._index.get(key)
+            entry = self._currencies.get(cu_id) if cu_id is not None else None
+            if entry is None:
+                return self.MISS, None
+            self._currencies.move_to_end(cu_id)
+            cu, fetched_at = entry
+            if self.supply_ttl is not None and now - fetched_at >= self.supply_ttl:
+                return self.STALE, copy.copy(cu)
+            return self.HIT, copy.copy(cu)
+
+    def put(self, currency: pigeonium.Currency) -> None:
+        """通貨情報を登録(または更新)します。"""
+        if self.max_size <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            cu = copy.copy(currency)
+            self._currencies[cu.currencyId] = (cu, now)
+            self._currencies.move_to_end(cu.currencyId)
+            for key in (("name", cu.name), ("symbol", cu.symbol), ("issuer", cu.issuer)):
+                self._index[key] = cu.currencyId
+                self._not_found.pop(key, None)
+            self._not_found.pop(("currencyId", cu.currencyId), None)
+            while len(self._currencies) > self.max_size:
+                _, (evicted, _) = self._currencies.popitem(last=False)
+                for key in (("name", evicted.name), ("symbol", evicted.symbol), ("issuer", evicted.issuer)):
+                    if self._index.get(key) == evicted.currencyId:
+                        del self._index[key]
+
+    def put_not_found(
+        self,
+        currency_id: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> None:
+        """検索条件に一致する通貨が存在しないことを negative_ttl 秒間記憶します。"""
+        key = self._key(currency_id, name, symbol, issuer)
+        if key is None or self.max_size <= 0 or self.negative_ttl <= 0:
+            return
+        with self._lock:
+            self._not_found[key] = time.monotonic() + self.negative_ttl
+            if len(self._not_found) > self.max_size:
+                now = time.monotonic()
+                self._not_found = {k: v for k, v in self._not_found.items() if v > now}
+
+    def clear(self) -> None:
+        """キャッシュをすべて破棄します。"""
+        with self._lock:
+            self._currencies.clear()
+            self._index.clear()
+            self._not_found.clear()
+
+class VariableCache:
+    """
+    コントラクトの変数(setVariableで保存された値)のキャッシュ。
+    値はコントラクトごとに、取得した時点でのそのコントラクトの最新のindexIdと組にして保持し、
+    最新のindexIdが変わった(新しいトランザクションがコントラクトに届いた)時点でそのコントラクトの値をすべて破棄します。
+    スレッドセーフです。max_contracts=0 でキャッシュを無効にできます。
+    """
+
+    def __init__(self, max_contracts: int = 256, max_keys: int = 4096):
+        """
+        Args:
+            max_contracts (int): 値を保持するコントラクトの最大数。
+            max_keys (int): 1つのコントラクトについて保持する変数の最大数。超えた場合はそのコントラクトの値を破棄します。
+        """
+        self.max_contracts = max_contracts
+        self.max_keys = max_keys
+        self._contracts: "OrderedDict[bytes, Tuple[int, Dict[bytes, Optional[bytes]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, contract_address: bytes, index_id: int, keys: Iterable[bytes]) -> Dict[bytes, Optional[bytes]]:
+        """index_id の時点で取得済みの値のうち、keys に含まれるものを返します。"""
+        with self._lock:
+            entry = self._contracts.get(contract_address)
+            if entry is None:
+                return {}
+            if entry[0] != index_id:
+                del self._contracts[contract_address]
+                return {}
+            self._contracts.move_to_end(contract_address)
+            values = entry[1]
+            return {key: values[key] for key in keys if key in values}
+
+    def put(self, contract_address: bytes, index_id: int, values: Dict[bytes, Optional[bytes]]) -> None:
+        """コントラクトの最新のindexIdが index_id の時点で取得した値を保存します。"""
+        if self.max_contracts <= 0:
+            return
+        with self._lock:
+            entry = self._contracts.get(contract_address)
+            if entry is None or entry[0] != index_id or len(entry[1]) + len(values) > self.max_keys:
+                entry = self._contracts[contract_address] = (index_id, {})
+            entry[1].update(values)
+            self._contracts.move_to_end(contract_address)
+            while len(self._contracts) > self.max_contracts:
+                self._contracts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contracts.clear()
+
+_SCALAR_TOKEN = re.compile(r"[-+.\w]*")
+
+def _iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    JSON配列を受信したチャンクから少しずつ読み取り、要素を1つずつ返します。
+    保持するのは未解析の末尾部分だけなので、配列全体の大きさに関わらずメモリ使用量は一定です。
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    state = "start"
+    for chunk in chunks:
+        buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if state == "start":
+                if buf[pos] != "[":
+                    raise ValueError("response is not a JSON array")
+                pos += 1
+                state = "first"
+            elif state == "first" and buf[pos] == "]":
+                return
+            elif state in ("first", "value"):
+                if buf[pos] in ",]":
+                    raise ValueError(f"unexpected character {buf[pos]!r} in JSON array")
+                if buf[pos] in "\"[{":
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        # 文字列・オブジェクト・配列がチャンクの境界で途切れているため、続きを待ちます。
+                        break
+                else:
+                    # 数値・true・false・null は区切り文字が届くまで終わりが確定しないため("1e" + "3" など)、続きを待ちます。
+                    token_end = _SCALAR_TOKEN.match(buf, pos).end()
+                    if token_end == len(buf):
+                        break
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        end = None
+                    if end != token_end:
+                        raise ValueError(f"invalid value {buf[pos:token_end + 1]!r} in JSON array")
+                pos = end
+                state = "separator"
+                yield value
+            else:
+                if buf[pos] == ",":
+                    state = "value"
+                elif buf[pos] == "]":
+                    return
+                else:
+                    raise ValueError(f"unexpected character {buf[pos]!r} in JSON array")
+                pos += 1
+    raise ValueError("incomplete JSON array")
+
+_HEDGEABLE_ENDPOINTS = frozenset({"/balance/{}/{}", "/balances/{}", "/currency", "/transaction/{}", "/transactions", "/variable/{}/{}"})
+
+def _endpoint_template(endpoint: str) -> str:
+    """"/balance/<address>/<currencyId>" のようなパスを "/balance/{}/{}" の形にまとめます。"""
+    segments = endpoint.split('?')[0].strip('/').split('/')
+    if not segments[0]:
+        return "/"
+    return "/" + "/".join([segments[0]] + ["{}"] * (len(segments) - 1))
+
+def _is_retryable(e: BaseException) -> bool:
+    """接続エラー・タイムアウト・5xx/429 のように、再送で成功する可能性がある失敗かどうか。"""
+    if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+        return e.response.status_code >= 500 or e.response.status_code == 429
+    return False
+
+class LatencyTracker:
+    """
+    エンドポイントごとに直近 window 件の応答時間を保持し、パーセンタイルを求めます。スレッドセーフです。
+    並べ替えた結果はキャッシュし、refresh 件の記録が増えるまで使い回します。並べ替えはロックの外で行います。
+    """
+
+    def __init__(self, window: int = 512, refresh: Optional[int] = None):
+        self.window = window
+        self.refresh = refresh if refresh is not None else max(1, window // 32)
+        self._samples: Dict[str, Deque[float]] = {}
+        self._recorded: Dict[str, int] = {}
+        self._sorted: Dict[str, Tuple[int, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, template: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(template)
+            if samples is None:
+                samples = self._samples[template] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._recorded[template] = self._recorded.get(template, 0) + 1
+
+    def percentile(self, template: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """q (0〜1) パーセンタイルの応答時間。サンプルが min_samples 未満の場合はNone。"""
+        with self._lock:
+            samples = self._samples.get(template)
+            if samples is None or len(samples) < min_samples:
+                return None
+            recorded = self._recorded[template]
+            cached = self._sorted.get(template)
+            snapshot = list(samples) if cached is None or recorded - cached[0] >= self.refresh else None
+        if snapshot is None:
+            ordered = cached[1]
+        else:
+            ordered = sorted(snapshot)
+            with self._lock:
+                self._sorted[template] = (recorded, ordered)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class RetryPolicy:
+    """
+    タイムアウト・再試行・ヘッジリクエストの設定。
+    タイムアウトは観測した応答時間の timeout_percentile パーセンタイルに timeout_multiplier を掛けた値を
+    timeout_min〜timeout_max に収めたものです(サンプルが揃うまでは timeout_max)。
+    再試行とヘッジは共通の予算から1回ごとに1トークンを消費し、トークンはリクエスト1回ごとに
+    retry_budget_ratio だけ補充されます(上限 retry_budget_max)。障害時に再試行が負荷を増幅するのを防ぎます。
+    hedge_percentile を指定すると、読み取り専用のGETが そのパーセンタイルより遅い場合に2本目のリクエストを送ります。
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        retry_budget_ratio: float = 0.1,
+        retry_budget_max: int = 10,
+        hedge_percentile: Optional[float] = None,
+        timeout_percentile: float = 0.99,
+        timeout_multiplier: float = 3.0,
+        timeout_min: float = 1.0,
+        timeout_max: float = 30.0,
+        window: int = 512,
+        min_samples: int = 20
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_max = retry_budget_max
+        self.hedge_percentile = hedge_percentile
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+        self._tokens = float(retry_budget_max)
+        self._lock = threading.Lock()
+
+    def timeout(self, template: str) -> float:
+        """エンドポイントに適用するタイムアウト(秒)。"""
+        observed = self.latency.percentile(template, self.timeout_percentile, self.min_samples)
+        if observed is None:
+            return self.timeout_max
+        return min(self.timeout_max, max(self.timeout_min, observed * self.timeout_multiplier))
+
+    def hedge_delay(self, template: str) -> Optional[float]:
+        """2本目のリクエストを送るまでの待ち時間(秒)。ヘッジしない場合はNone。"""
+        if self.hedge_percentile is None:
+            return None
+        return self.latency.percentile(template, self.hedge_percentile, self.min_samples)
+
+    def record(self, template: str, seconds: Optional[float]) -> None:
+        """リクエスト1回分を記録し、再試行の予算を補充します。secondsがNoneの場合は応答時間を記録しません。"""
+        if seconds is not None:
+            self.latency.record(template, seconds)
+        with self._lock:
+            self._tokens = min(float(self.retry_budget_max), self._tokens + self.retry_budget_ratio)
+
+    def withdraw(self) -> bool:
+        """再試行またはヘッジ1回分の予算を消費します。予算が尽きている場合はFalse。"""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def backoff(self, attempt: int) -> float:
+        """attempt回目の再試行前の待ち時間(秒)。指数バックオフにフルジッタを加えたものです。"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+def _next_poll_interval(
+    interval: float,
+    fetched: int,
+    page_size: int,
+    min_interval: float,
+    max_interval: float,
+    backoff: float
+) -> float:
+    """
+    次のポーリングまでの待ち時間。
+    ページが満杯なら待たずに続きを取得し、新着があれば min_interval に戻し、新着がなければ backoff 倍に延ばします。
+    """
+    if fetched >= page_size:
+        return 0.0
+    if fetched:
+        return min_interval
+    return min(max_interval, max(interval, min_interval) * backoff)
+
+_END_OF_PAGES = object()
+
+def _last_index_id(rows: List[Dict[str, Any]]|TransactionBatch) -> int:
+    """JSONの行のリストまたはバイナリ形式から読み込んだ TransactionBatch の、最後のトランザクションのindexId。"""
+    if isinstance(rows, TransactionBatch):
+        return rows.indexId[-1]
+    return rows[-1]['indexId']
 
 class IterableTransaction:
+    """
+    /transactions をページ単位で取得しながら1件ずつ返すイテレータ。
+    prefetch > 0 の場合、呼び出し側が現在のページを処理している間に
+    バックグラウンドスレッドで次のページを先読みします。
+    保持するトランザクションは最大 (prefetch + 2) * page_size 件です。
+    as_batch=True の場合は、1件ずつではなくページごとの TransactionBatch を返します。
+    verify=True の場合は、ページごとに署名を検証します(先読みが有効なら先読みスレッドで検証します)。
+    """
+
     def __init__(
         self,client:"PigeoniumClient",
         params: dict,
         indexId_start: Optional[int] = None,
-        sort_order: Literal["ASC", "DESC"] = "DESC"
+        sort_order: Literal["ASC", "DESC"] = "DESC",
+        page_size: int = 20,
+        prefetch: int = 1,
+        as_batch: bool = False,
+        verify: bool = False
     ):
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative")
         self._client = client
         self.params = params
         self.params['sort_order'] = sort_order
+        self.params['limit'] = page_size
         self.sort_order = sort_order
-        self.offset = 0
-        self.txs:List[pigeonium.Transaction] = []
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.as_batch = as_batch
+        self.verify = verify
         self.indexId_start = indexId_start
+        self.txs: Deque[pigeonium.Transaction] = deque()
+        self._cursor: Optional[Dict[str, Any]] = None
+        self._pages: Optional[queue.Queue] = None
+        self._stop: Optional[threading.Event] = None
         self.end_flag = False
-    
+
     def __iter__(self):
-        self.offset = 0
-        self.txs = []
-        self.end_flag = False
-        if self.indexId_start:
-            self.params['indexId_start'] = self.indexId_start
+        self._start()
         return self
-    
+
+    def _start(self) -> None:
+        """先頭から取得し直す状態にします。iter()を呼ばずにnext()した場合は最初のnext()で呼ばれます。"""
+        self.close()
+        self.txs = deque()
+        self.end_flag = False
+        # indexIdを起点にしたキーセット方式でページングするため、offsetは常に0です。
+        self._cursor = dict(self.params, offset=0)
+        if self.indexId_start is not None:
+            self._cursor['indexId_start'] = self.indexId_start
+        if self.prefetch > 0:
+            self._stop = threading.Event()
+            self._pages = queue.Queue(maxsize=self.prefetch)
+            threading.Thread(
+                target=IterableTransaction._prefetch_pages,
+                args=(self._client, self._cursor, self.sort_order, self.as_batch, self.verify, self._pages, self._stop),
+                daemon=True
+            ).start()
+
     def __next__(self):
+        if self._cursor is None:
+            self._start()
         if not self.txs:
             if self.end_flag:
                 raise StopIteration
-            self.params['offset'] = self.offset
-            params = self.params
-
-            response = self._client._get("/transactions", params=params)
-            if not response: raise StopIteration
-            self.offset += self.params['limit']
-            response_tx = [pigeonium.Transaction.fromHexDict(tx) for tx in response]
-            self.txs += response_tx
-            if len(response_tx) < self.params['limit']:
+            if self._pages is None:
+                page = IterableTransaction._fetch_page(self._client, self._cursor, self.sort_order, self.as_batch, self.verify)
+            else:
+                page = self._pages.get()
+                if isinstance(page, BaseException):
+                    self.end_flag = True
+                    raise page
+            if page is _END_OF_PAGES or not page:
                 self.end_flag = True
-        tx = self.txs.pop(0)
-        if not 'indexId_start' in self.params and self.txs:
-            self.params['indexId_start'] = self.txs[-1].indexId + 1 if self.sort_order == "ASC" else self.txs[-1].indexId - 1
-            self.offset = 0
-        return tx
+                raise StopIteration
+            if len(page) < self.page_size:
+                self.end_flag = True
+            if self.as_batch:
+                return page
+            self.txs = page
+        return self.txs.popleft()
+
+    def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        """先読みスレッドを停止します。"""
+        if self._stop is not None:
+            self._stop.set()
+        self._stop = None
+        self._pages = None
+
+    @staticmethod
+    def _fetch_page(
+        client: "PigeoniumClient",
+        cursor: Dict[str, Any],
+        sort_order: str,
+        as_batch: bool = False,
+        verify: bool = False
+    ) -> Deque[pigeonium.Transaction]|TransactionBatch:
+        """cursorの条件で1ページ取得し、cursorを次のページの起点に進めます。"""
+        response = client._get("/transactions", params=cursor, binary=True)
+        page = client._decode_transactions("/transactions", response, as_batch)
+        if verify:
+            client._check_signatures(page)
+        if not as_batch:
+            page = deque(page)
+        if response:
+            last_index_id = _last_index_id(response)
+            cursor['indexId_start'] = last_index_id + 1 if sort_order == "ASC" else last_index_id - 1
+        return page
+
+    @staticmethod
+    def _prefetch_pages(
+        client: "PigeoniumClient",
+        cursor: Dict[str, Any],
+        sort_order: str,
+        as_batch: bool,
+        verify: bool,
+        pages: queue.Queue,
+        stop: threading.Event
+    ) -> None:
+        # イテレータ本体を参照しないことで、呼び出し側が手放した時点で__del__から停止できるようにします。
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        while not stop.is_set():
+            try:
+                page = IterableTransaction._fetch_page(client, cursor, sort_order, as_batch, verify)
+            except Exception as e:
+                put(e)
+                return
+            if len(page) < cursor['limit']:
+                put(page if page else _END_OF_PAGES)
+                return
+            if not put(page):
+                return
 
 class PigeoniumClient:
     """
@@ -52,59 +805,389 @@ class PigeoniumClient:
     APIサーバーを介して、残高照会、トランザクション送信、コントラクトデプロイなどの機能を提供します。
     """
 
-    def __init__(self, base_url: str = "http://127.0.0.1:14540"):
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:14540",
+        currency_cache: Optional[CurrencyCache] = None,
+        network_cache_path: Optional[str] = None,
+        network_cache_ttl: float = 3600.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        hooks: Iterable[ClientHook] = (),
+        verifier: Optional[SignatureVerifier] = None,
+        variable_cache: Optional[VariableCache] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        wire_format: Literal["binary", "json"] = "binary",
+        hedge_workers: Optional[int] = None,
+        worker_processes: Optional[int] = None
+    ):
         """
         PigeoniumClientを初期化します。
-        初期化時にサーバーに接続し、ネットワーク情報を取得・設定します。
+        ネットワーク情報は最初に必要になった時点でサーバー(またはキャッシュファイル)から取得します。
+        取得した設定はクライアントごとに保持され、pigeonium.Configは署名時にのみ更新されます。
 
         Args:
             base_url (str): Pigeonium APIサーバーのベースURL。
+            currency_cache (Optional[CurrencyCache]): get_currencyが使うキャッシュ。Noneの場合は既定の設定で作成します。
+            network_cache_path (Optional[str]): ネットワーク情報を保存するJSONファイルのパス。Noneでファイルに保存しません。
+            network_cache_ttl (float): キャッシュファイルのネットワーク情報の有効期間(秒)。
+            retry_policy (Optional[RetryPolicy]): タイムアウト・再試行・ヘッジの設定。Noneの場合はいずれも行いません。
+            hooks (Iterable[ClientHook]): リクエスト・デコード・署名の計測フック(ClientMetricsなど)。
+            verifier (Optional[SignatureVerifier]): 署名の検証方法。Noneの場合は SignatureVerifier()。
+            variable_cache (Optional[VariableCache]): get_variablesが使うキャッシュ。Noneの場合は既定の設定で作成します。
+            pool_connections (int): コネクションプールを保持する接続先ホストの数。
+            pool_maxsize (int): 接続先ホストごとに保持する接続の数。同時に使うスレッド数以上にしてください。
+            pool_block (bool): Trueの場合、ホストごとの接続数が pool_maxsize に達すると空くまで待ちます。
+                Falseの場合は一時的な接続を作成します(プールには戻しません)。
+            wire_format (Literal["binary", "json"]): "binary" の場合、トランザクションのページを
+                バイナリ形式(pigeonium_wire)で要求します。サーバーが対応していなければJSONで受け取ります。
+                レスポンスの圧縮(gzip、urllib3が対応していればzstd)はどちらの場合も要求します。
+            hedge_workers (Optional[int]): ヘッジリクエストに使うスレッド数。最初のリクエストもこのスレッドで送るため、
+                同時にリクエストするスレッド数の2倍以上にしてください。Noneの場合は pool_maxsize の2倍。
+            worker_processes (Optional[int]): send_transactions の署名と verify_transactions の検証に使うプロセス数。
+                Noneの場合はCPU数。プロセスプールは最初に必要になった時点で作成し、以降は使い回します。
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.network_info: Optional[Dict[str, str|int|Dict]] = None
-
-        self._fetch_and_apply_network_info()
-
-    def _fetch_and_apply_network_info(self) -> None:
-        """サーバーからネットワーク情報を取得し、ローカルのpigeonium.Configを更新します。"""
-        response = self.session.get(f"{self.base_url}/")
-        response.raise_for_status()
-        self.network_info = response.json()
-
-        pigeonium.Config.NetworkName = self.network_info['networkName']
-        pigeonium.Config.NetworkId = self.network_info['networkId']
-        pigeonium.Config.ContractDeployCost = self.network_info['contractDeployCost']
-        pigeonium.Config.AdminPublicKey = bytes.fromhex(self.network_info['adminPublicKey'])
-
-        base_currency_info = self.network_info['baseCurrency']
-        base_currency = pigeonium.Currency()
-        base_currency.currencyId = bytes.fromhex(base_currency_info['currencyId'])
-        base_currency.name = base_currency_info['name']
-        base_currency.symbol = base_currency_info['symbol']
-        base_currency.issuer = bytes.fromhex(base_currency_info['issuer'])
-        base_currency.supply = base_currency_info['supply']
-        pigeonium.Config.BaseCurrency = base_currency
-
-        print(f"ネットワーク '{self.network_info['networkName']}' (ID: {self.network_info['networkId']}) に接続しました。")
-
-    def _post(self, endpoint: str, json_data: Dict[str, str|int]) -> Dict[str, str|int]:
+        self._adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self._local = threading.local()
+        self.wire_format = wire_format
+        self._session: Optional[requests.Session] = None
+        self.currency_cache = currency_cache if currency_cache is not None else CurrencyCache()
+        self.variable_cache = variable_cache if variable_cache is not None else VariableCache()
+        self.network_cache_path = network_cache_path
+        self.network_cache_ttl = network_cache_ttl
+        self._config: Optional[NetworkConfig] = None
+        self._config_lock = threading.Lock()
+        self.retry_policy = retry_policy
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.hedge_workers = hedge_workers if hedge_workers is not None else 2 * pool_maxsize
+        self.worker_processes = worker_processes
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.verifier = verifier if verifier is not None else SignatureVerifier()
+        self._executor_lock = threading.Lock()
+        self.hooks: Tuple[ClientHook, ...] = tuple(hooks)
+        self._inflight: Dict[Tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        リクエストに使うSession。呼び出したスレッド専用のSessionで、1つのクライアントを複数のスレッドから使えます。
+        各スレッドのSessionは同じコネクションプールを共有します。
+        代入した場合は、そのSessionをすべてのスレッドで使います(Session自体がスレッドセーフである必要があります)。
+        """
+        if self._session is not None:
+            return self._session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        self._session = session
+
+    def __enter__(self) -> "PigeoniumClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        ヘッジ用のスレッドプールと、署名・検証用のプロセスプールを停止し、コネクションプールを閉じます。
+        実行中のリクエストと署名・検証は完了を待ちます。閉じた後に使った場合、プールは必要になった時点で作り直されます。
+        """
+        with self._executor_lock:
+            executors = [self._hedge_executor, self._process_pool]
+            self._hedge_executor = None
+            self._process_pool = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown()
+        self._adapter.close()
+
+    @property
+    def network_info(self) -> Dict[str, str|int|Dict]:
+        """サーバーから取得したネットワーク情報。初回アクセス時に読み込まれます。"""
+        return self.config.network_info
+
+    @property
+    def config(self) -> NetworkConfig:
+        """このクライアントのネットワーク設定。初回アクセス時に読み込まれます。"""
+        if self._config is None:
+            with self._config_lock:
+                if self._config is None:
+                    self._config = NetworkConfig(self._load_network_info())
+        return self._config
+
+    def apply_global_config(self) -> None:
+        """このクライアントのネットワーク設定をpigeonium.Configに反映します。"""
+        self.config.apply()
+
+    def _load_network_info(self) -> Dict[str, Any]:
+        """キャッシュファイルが有効ならそこから、そうでなければサーバーからネットワーク情報を取得します。"""
+        cached = _read_network_cache(self.network_cache_path, self.base_url, self.network_cache_ttl)
+        if cached is not None:
+            return cached
+        network_info = self._get("/")
+        _write_network_cache(self.network_cache_path, self.base_url, network_info)
+        return network_info
+
+    def add_hook(self, hook: ClientHook) -> None:
+        """計測フックを登録します。"""
+        self.hooks = self.hooks + (hook,)
+
+    def remove_hook(self, hook: ClientHook) -> None:
+        """登録済みの計測フックを解除します。"""
+        self.hooks = tuple(h for h in self.hooks if h is not hook)
+
+    def _emit_request(
+        self,
+        method: str,
+        template: str,
+        start: float,
+        retries: int,
+        response: Optional[requests.Response],
+        error: Optional[BaseException],
+        bytes_received: Optional[int] = None
+    ) -> None:
+        bytes_sent = 0
+        status = None
+        if response is not None:
+            status = response.status_code
+            body = response.request.body if response.request is not None else None
+            bytes_sent = len(body) if body else 0
+            if bytes_received is None:
+                # 圧縮されている場合、Content-Lengthは展開前の(実際に受信した)サイズです。
+                length = response.headers.get("Content-Length")
+                bytes_received = int(length) if length is not None else len(response.content)
+        event = RequestEvent(method, template, status, time.perf_counter() - start,
+                             bytes_sent, bytes_received or 0, retries, error)
+        for hook in self.hooks:
+            hook.on_request(event)
+
+    def _worker_pool(self) -> ProcessPoolExecutor:
+        """署名と検証に使うプロセスプール。最初に必要になった時点で作成し、以降は使い回します。"""
+        if self._process_pool is None:
+            network_info = self.network_info
+            with self._executor_lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.worker_processes,
+                        initializer=_init_signing_worker,
+                        initargs=(network_info,)
+                    )
+        return self._process_pool
+
+    def _emit_signing(self, operation: str, start: float) -> None:
+        seconds = time.perf_counter() - start
+        for hook in self.hooks:
+            hook.on_signing(operation, seconds)
+
+    def _decode_transactions(
+        self,
+        endpoint: str,
+        rows: List[Dict[str, Any]]|TransactionBatch,
+        as_batch: bool = False
+    ) -> List[pigeonium.Transaction]|TransactionBatch:
+        """
+        APIのトランザクション(16進数文字列の辞書)をデコードし、かかった時間をフックに通知します。
+        バイナリ形式から読み込み済みの TransactionBatch はそのまま(as_batch=Falseならリストにして)返します。
+        """
+        if isinstance(rows, TransactionBatch) and as_batch:
+            return rows
+        hooks = self.hooks
+        start = time.perf_counter() if hooks else 0.0
+        if isinstance(rows, TransactionBatch):
+            txs = rows.to_list()
+        elif as_batch:
+            txs = TransactionBatch.from_hex_dicts(rows)
+        else:
+            txs = [pigeonium.Transaction.fromHexDict(tx) for tx in rows]
+        if hooks:
+            seconds = time.perf_counter() - start
+            for hook in hooks:
+                hook.on_decode(endpoint, seconds, len(rows))
+        return txs
+
+    def _decode_transaction(self, endpoint: str, row: Dict[str, Any]) -> pigeonium.Transaction:
+        return self._decode_transactions(endpoint, [row])[0]
+
+    def _decode_wire(self, template: str, content: bytes) -> TransactionBatch:
+        hooks = self.hooks
+        start = time.perf_counter() if hooks else 0.0
+        batch = pigeonium_wire.decode_transactions(content)
+        if hooks:
+            seconds = time.perf_counter() - start
+            for hook in hooks:
+                hook.on_decode(template, seconds, len(batch))
+        return batch
+
+    def _send(self, method: str, endpoint: str, template: str, **kwargs) -> requests.Response:
+        """1回分のHTTPリクエストを送信し、応答時間をretry_policyに記録します。"""
+        policy = self.retry_policy
+        if policy is None:
+            return self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{endpoint}", timeout=policy.timeout(template), **kwargs)
+        except requests.exceptions.Timeout:
+            policy.record(template, time.perf_counter() - start)
+            raise
+        except requests.exceptions.RequestException:
+            policy.record(template, None)
+            raise
+        policy.record(template, time.perf_counter() - start)
+        return response
+
+    def _send_hedged(self, method: str, endpoint: str, template: str, delay: float, **kwargs) -> requests.Response:
+        """最初のリクエストがdelay秒以内に終わらなければ同じリクエストをもう1本送り、先に成功した応答を返します。"""
+        if self._hedge_executor is None:
+            with self._executor_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=self.hedge_workers, thread_name_prefix="pigeonium-hedge")
+        futures: List[Future] = [self._hedge_executor.submit(self._send, method, endpoint, template, **kwargs)]
+        done, _ = wait(futures, timeout=delay)
+        if not done and self.retry_policy.withdraw():
+            futures.append(self._hedge_executor.submit(self._send, method, endpoint, template, **kwargs))
+        last: Optional[Future] = None
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                last = future
+                if future.exception() is None and future.result().status_code < 500:
+                    return future.result()
+        return last.result()
+
+    def _request(self, method: str, endpoint: str, idempotent: bool, **kwargs) -> Any:
+        """
+        リクエストを送信してJSONを返します。
+        retry_policyが設定されている場合、idempotentなリクエストは再試行し、読み取り専用のGETはヘッジします。
+        """
+        template = _endpoint_template(endpoint)
+        policy = self.retry_policy
+        start = time.perf_counter()
+        attempt = 0
+        response: Optional[requests.Response] = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                try:
+                    delay = policy.hedge_delay(template) if policy is not None and method == "GET" and template in _HEDGEABLE_ENDPOINTS else None
+                    if delay is not None:
+                        response = self._send_hedged(method, endpoint, template, delay, **kwargs)
+                    else:
+                        response = self._send(method, endpoint, template, **kwargs)
+                    response.raise_for_status()
+                    if response.headers.get("Content-Type", "").startswith(pigeonium_wire.CONTENT_TYPE):
+                        return self._decode_wire(template, response.content)
+                    return response.json()
+                except requests.exceptions.RequestException as e:
+                    if (policy is None or not idempotent or attempt >= policy.max_retries
+                            or not _is_retryable(e) or not policy.withdraw()):
+                        raise
+                    time.sleep(policy.backoff(attempt))
+                    attempt += 1
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.hooks:
+                self._emit_request(method, template, start, attempt, response, error)
+
+    def _find_submitted_transaction(self, source_hex: str, signature_hex: str, depth: int = 100) -> Optional[Dict[str, Any]]:
+        """sourceの直近のトランザクションから、同じ署名を持つもの(=受理済みの送信)を探します。"""
+        params = {"source": source_hex, "sort_by": "indexId", "sort_order": "DESC", "limit": depth, "offset": 0}
+        for tx in self._request("GET", "/transactions", True, params=params):
+            if tx.get('signature') == signature_hex:
+                return tx
+        return None
+
+    def _post(self, endpoint: str, json_data: Dict[str, str|int], duplicate_key: Optional[Tuple[str, str]] = None) -> Dict[str, str|int]:
+        """
+        POSTリクエストを送信します。
+        POSTは原則として再試行しません。duplicate_key (送信元アドレス, 署名) が指定され、retry_policyが設定されている場合に限り、
+        再送前にそのトランザクションが受理済みでないかを確認したうえで再試行します。
+        """
+        try:
+            policy = self.retry_policy
+            if duplicate_key is None or policy is None:
+                return self._request("POST", endpoint, False, json=json_data)
+            attempt = 0
+            while True:
+                try:
+                    return self._request("POST", endpoint, False, json=json_data)
+                except requests.exceptions.RequestException as e:
+                    if attempt >= policy.max_retries or not _is_retryable(e) or not policy.withdraw():
+                        raise
+                    time.sleep(policy.backoff(attempt))
+                    try:
+                        submitted = self._find_submitted_transaction(*duplicate_key)
+                    except requests.exceptions.RequestException:
+                        # 受理済みかどうか確認できない場合は、二重送信を避けるため元のエラーを返します。
+                        raise e
+                    if submitted is not None:
+                        return submitted
+                    attempt += 1
+        except requests.exceptions.HTTPError as e:
+            print(f"{e.response.status_code}: {e.response.text}")
+            raise e
+
+    def _get(self, endpoint: str, params: dict={}, binary: bool = False) -> Dict[str, Any]:
+        """
+        binary=True の場合、wire_formatが "binary" ならバイナリ形式を要求します。
+        サーバーがバイナリ形式で応答した場合は TransactionBatch を返します。
+        """
+        headers = {"Accept": pigeonium_wire.ACCEPT} if binary and self.wire_format == "binary" else None
         try:
-            response = self.session.post(f"{self.base_url}{endpoint}", json=json_data)
-            response.raise_for_status()
-            return response.json()
+            return self._request("GET", endpoint, True, params=params, headers=headers)
         except requests.exceptions.HTTPError as e:
             print(f"{e.response.status_code}: {e.response.text}")
             raise e
 
-    def _get(self, endpoint: str, params: dict={}) -> Dict[str, Any]:
+    def _get_stream(self, endpoint: str, params: dict={}, chunk_size: int = 65536) -> Iterator[Any]:
+        """JSON配列を返すエンドポイントを、受信しながら要素ごとに返します。"""
+        template = _endpoint_template(endpoint)
+        start = time.perf_counter()
+        received = 0
+        response: Optional[requests.Response] = None
+        error: Optional[BaseException] = None
+
+        def chunks(response: requests.Response) -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                received += len(chunk)
+                yield chunk
+
         try:
-            response = self.session.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
+            with self._send("GET", endpoint, template, params=params, stream=True) as response:
+                response.raise_for_status()
+                yield from _iter_json_array(chunks(response))
         except requests.exceptions.HTTPError as e:
+            error = e
             print(f"{e.response.status_code}: {e.response.text}")
             raise e
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.hooks:
+                self._emit_request("GET", template, start, 0, response, error, received)
 
     @staticmethod
     def generate_wallet() -> pigeonium.Wallet:
@@ -120,22 +1203,91 @@ class PigeoniumClient:
         """
         return pigeonium.Wallet.fromPrivate(bytes.fromhex(private_key_hex))
 
+    def _single_flight(self, key: Tuple, fn, *args) -> Any:
+        """
+        同じkeyの呼び出しが実行中であれば、新たにリクエストを送らずその結果を共有します。
+        最初の呼び出し元がfnを実行し、後から来た呼び出し元は結果のコピーを受け取ります。
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return copy.copy(future.result())
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
     def get_balance(self, address: bytes, currency_id: bytes) -> int:
         """
         指定されたアドレスの単一の通貨残高を取得します。
         """
-        result = self._get(f"/balance/{address.hex()}/{currency_id.hex()}")
+        endpoint = f"/balance/{address.hex()}/{currency_id.hex()}"
+        result = self._single_flight(("GET", endpoint), self._get, endpoint)
         return result.get('amount', 0)
     
     def get_balances(self, address: bytes) -> Dict[bytes, int]:
         """
         指定されたアドレスの通貨残高を取得します。
         """
-        result = self._get(f"/balances/{address.hex()}")
+        endpoint = f"/balances/{address.hex()}"
+        result = self._single_flight(("GET", endpoint), self._get, endpoint)
         bals = {}
         for cu_id in result.keys():
             bals[bytes.fromhex(cu_id)] = result[cu_id]
         return bals
+
+    def get_balances_many(
+        self,
+        addresses: Iterable[bytes],
+        currency_id: Optional[bytes] = None,
+        max_workers: int = 16
+    ) -> Iterator[Tuple[bytes, Dict[bytes, int]|int|Exception]]:
+        """
+        複数のアドレスの残高を並列に取得し、取得できたものから順に返します。
+        同時に実行中の同じ問い合わせ(他のスレッドからのものを含む)は1回のHTTPリクエストにまとめられます。
+
+        Args:
+            addresses (Iterable[bytes]): 残高を取得するアドレス。
+            currency_id (Optional[bytes], optional): 指定した場合はその通貨の残高(get_balance)、
+                省略した場合は全通貨の残高(get_balances)を取得します。
+            max_workers (int, optional): 同時に発行するリクエスト数の上限。 Defaults to 16.
+
+        Yields:
+            Tuple[bytes, Dict[bytes, int]|int|Exception]: (アドレス, 残高)。取得に失敗した場合は残高の代わりに例外が入ります。
+        """
+        if currency_id is None:
+            fetch, args = self.get_balances, ()
+        else:
+            fetch, args = self.get_balance, (currency_id,)
+        remaining = iter(addresses)
+        pending: Dict[Future, bytes] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def fill() -> None:
+                # 未処理のアドレスを一度にすべて投入せず、同時実行数の2倍までに抑えます。
+                while len(pending) < max_workers * 2:
+                    address = next(remaining, None)
+                    if address is None:
+                        return
+                    pending[executor.submit(fetch, address, *args)] = address
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    address = pending.pop(future)
+                    error = future.exception()
+                    yield address, error if error is not None else future.result()
+                fill()
     
     def get_currency(
         self,
@@ -144,25 +1296,131 @@ class PigeoniumClient:
         symbol: Optional[str] = None,
         issuer: Optional[bytes] = None
     ) -> pigeonium.Currency|None:
+        """
+        通貨情報を取得します。currency_id, name, symbol, issuer の順に最初に指定された条件で検索します。
+        結果は currency_cache に保持され、supplyが期限切れになるまではHTTPリクエストを行いません。
+        supplyの再取得に失敗した場合(404を除く)は、期限切れのキャッシュを返します。
+
+        Returns:
+            pigeonium.Currency|None: 通貨情報。見つからない場合はNone。
+        """
+        state, cached = self.currency_cache.lookup(currency_id, name, symbol, issuer)
+        if state == CurrencyCache.HIT:
+            return cached
+        if state == CurrencyCache.NOT_FOUND:
+            return None
+        params = _currency_params(currency_id, name, symbol, issuer)
+        # supplyの更新に失敗した場合は、期限切れのキャッシュをそのまま返します。
+        fallback = None
+        if state == CurrencyCache.STALE:
+            params = {"currencyId": cached.currencyId.hex()}
+            fallback = cached
         try:
-            if currency_id:
-                response = self._get(f"/currency", {"currencyId": currency_id.hex()})
-            elif name:
-                response = self._get(f"/currency", {"name": name})
-            elif symbol:
-                response = self._get(f"/currency", {"symbol": symbol})
-            elif issuer:
-                response = self._get(f"/currency", {"issuer": issuer.hex()})
-            cu = pigeonium.Currency()
-            cu.currencyId = bytes.fromhex(response['currencyId'])
-            cu.name = response['name']
-            cu.symbol = response['symbol']
-            cu.issuer = bytes.fromhex(response['issuer'])
-            cu.supply = response['supply']
-            return cu
+            response = self._get(f"/currency", params)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                self.currency_cache.put_not_found(currency_id, name, symbol, issuer)
+                return None
+            return fallback
         except:
+            return fallback
+        if not response:
+            self.currency_cache.put_not_found(currency_id, name, symbol, issuer)
             return None
+        try:
+            cu = _currency_from_dict(response)
+        except:
+            return fallback
+        self.currency_cache.put(cu)
+        return cu
+
+    def warm_currency_cache(self, balances: Dict[bytes, int], max_workers: int = 8) -> Dict[bytes, pigeonium.Currency|None]:
+        """
+        get_balancesの結果に含まれる通貨をまとめてキャッシュに読み込みます。
+        キャッシュにない通貨だけを並列に取得するため、残高の行ごとにget_currencyを呼んでも追加のリクエストは発生しません。
+
+        Args:
+            balances (Dict[bytes, int]): get_balancesの戻り値(またはcurrencyIdの集合)。
+            max_workers (int, optional): 同時に発行するリクエスト数の上限。 Defaults to 8.
+
+        Returns:
+            Dict[bytes, pigeonium.Currency|None]: currencyIdと通貨情報の対応。
+        """
+        currencies: Dict[bytes, pigeonium.Currency|None] = {}
+        missing = []
+        for cu_id in balances:
+            state, cached = self.currency_cache.lookup(cu_id)
+            if state == CurrencyCache.HIT:
+                currencies[cu_id] = cached
+            elif state == CurrencyCache.NOT_FOUND:
+                currencies[cu_id] = None
+            else:
+                missing.append(cu_id)
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+                for cu_id, cu in zip(missing, executor.map(self.get_currency, missing)):
+                    currencies[cu_id] = cu
+        return currencies
     
+    def _latest_index_id(self, address: bytes) -> int:
+        """addressが送信元または宛先になっている最新のトランザクションのindexId。ない場合は0。"""
+        params = {"address": address.hex(), "limit": 1, "offset": 0, "sort_by": "indexId", "sort_order": "DESC"}
+        rows = self._single_flight(("GET", "/transactions", address), self._get, "/transactions", params)
+        return rows[0]['indexId'] if rows else 0
+
+    def _get_variable(self, contract_address: bytes, key: bytes) -> Optional[bytes]:
+        endpoint = f"/variable/{contract_address.hex()}/{key.hex()}"
+        try:
+            # 未設定の変数は404になるため、エラーを表示する _get を通さずに取得します。
+            result = self._single_flight(("GET", endpoint), self._request, "GET", endpoint, True)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        value = result.get('value')
+        return bytes.fromhex(value) if value is not None else None
+
+    def get_variable(self, contract_address: bytes, key: bytes) -> Optional[bytes]:
+        """
+        コントラクトの変数を1つ取得します。get_variablesと同じキャッシュを使います。
+        """
+        return self.get_variables(contract_address, [key])[key]
+
+    def get_variables(
+        self,
+        contract_address: bytes,
+        keys: Iterable[bytes],
+        max_workers: int = 16
+    ) -> Dict[bytes, Optional[bytes]]:
+        """
+        コントラクトの変数(setVariableで保存された値)をまとめて取得します。
+        最初にコントラクトの最新のindexIdを1回だけ問い合わせ、前回からトランザクションが届いていなければ
+        variable_cache の値を返します。キャッシュにないキーは最大 max_workers 件を並列に取得します。
+        値はindexIdを確認した後に取得するため、取得中に届いたトランザクションの結果を含むことがありますが、
+        その場合は次回の呼び出しでindexIdが変わるため再取得されます。
+
+        Args:
+            contract_address (bytes): コントラクトのアドレス。
+            keys (Iterable[bytes]): 変数のキー。
+            max_workers (int, optional): 同時に発行するリクエスト数の上限。 Defaults to 16.
+
+        Returns:
+            Dict[bytes, Optional[bytes]]: キー -> 値。存在しない変数の値はNoneです。
+        """
+        keys = list(dict.fromkeys(keys))
+        index_id = self._latest_index_id(contract_address)
+        values = self.variable_cache.lookup(contract_address, index_id, keys)
+        missing = [key for key in keys if key not in values]
+        if missing:
+            if len(missing) == 1:
+                fetched = {missing[0]: self._get_variable(contract_address, missing[0])}
+            else:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                    fetched = dict(zip(missing, executor.map(lambda key: self._get_variable(contract_address, key), missing)))
+            self.variable_cache.put(contract_address, index_id, fetched)
+            values.update(fetched)
+        return {key: values[key] for key in keys}
+
     def get_transaction(self, index_id: int) -> Optional[pigeonium.Transaction]:
         """
         指定されたインデックスIDのトランザクションを取得します。
@@ -176,7 +1434,7 @@ class PigeoniumClient:
         try:
             response = self._get(f"/transaction/{index_id}")
             if response:
-                return pigeonium.Transaction.fromHexDict(response)
+                return self._decode_transaction("/transaction/{}", response)
             return None
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
@@ -199,40 +1457,260 @@ class PigeoniumClient:
         sort_by: Literal["indexId", "timestamp", "amount", "feeAmount"] = "indexId",
         sort_order: Literal["ASC", "DESC"] = "DESC",
         limit: int = 20,
-        offset: int = 0
-    ) -> List[pigeonium.Transaction]:
+        offset: int = 0,
+        as_batch: bool = False,
+        verify: bool = False
+    ) -> List[pigeonium.Transaction]|TransactionBatch:
+        """
+        条件に一致するトランザクションを取得します。
+        as_batch=True の場合は、列ごとにまとめた TransactionBatch を返します。
+        verify=True の場合は署名を検証し、正しくないものが含まれていれば InvalidSignatureError を送出します。
+        """
+        params = {
+            "limit": limit,
+            "offset": offset,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+        }
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            indexId_start, indexId_end, timestamp_start, timestamp_end, is_contract
+        ))
+
+        response = self._get("/transactions", params=params, binary=True)
+        txs = self._decode_transactions("/transactions", response, as_batch)
+        if verify:
+            self._check_signatures(txs)
+        return txs
+    
+    def stream_transactions(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        indexId_start: Optional[int] = None,
+        indexId_end: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        is_contract: Optional[bool] = None,
+        sort_by: Literal["indexId", "timestamp", "amount", "feeAmount"] = "indexId",
+        sort_order: Literal["ASC", "DESC"] = "DESC",
+        limit: int = 1000,
+        offset: int = 0,
+        chunk_size: int = 65536
+    ) -> Iterator[pigeonium.Transaction]:
+        """
+        get_transactionsと同じ条件で取得し、レスポンスを受信しながら1件ずつ返します。
+        レスポンス全体を読み込まないため、limitが大きくてもメモリ使用量は増えず、
+        最初のトランザクションはダウンロードの完了前に返されます。
+
+        Args:
+            chunk_size (int, optional): ソケットから一度に読み込むバイト数。 Defaults to 65536.
+        """
         params = {
             "limit": limit,
             "offset": offset,
             "sort_by": sort_by,
             "sort_order": sort_order,
         }
-        if address:
-            params["address"] = address.hex()
-        if source:
-            params["source"] = source.hex()
-        if dest:
-            params["dest"] = dest.hex()
-        if currencyId:
-            params["currencyId"] = currencyId.hex()
-        if amount_min is not None:
-            params["amount_min"] = amount_min
-        if amount_max is not None:
-            params["amount_max"] = amount_max
-        if indexId_start is not None:
-            params["indexId_start"] = indexId_start
-        if indexId_end is not None:
-            params["indexId_end"] = indexId_end
-        if timestamp_start is not None:
-            params["timestamp_start"] = timestamp_start
-        if timestamp_end is not None:
-            params["timestamp_end"] = timestamp_end
-        if is_contract is not None:
-            params["is_contract"] = is_contract
-
-        response = self._get("/transactions", params=params)
-        return [pigeonium.Transaction.fromHexDict(tx) for tx in response]
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            indexId_start, indexId_end, timestamp_start, timestamp_end, is_contract
+        ))
+
+        for tx in self._get_stream("/transactions", params=params, chunk_size=chunk_size):
+            yield self._decode_transaction("/transactions", tx)
+    
+    def watch_transactions(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        indexId_start: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        is_contract: Optional[bool] = None,
+        page_size: int = 100,
+        min_interval: float = 0.2,
+        max_interval: float = 5.0,
+        backoff: float = 2.0,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[pigeonium.Transaction]:
+        """
+        新しいトランザクションを監視し、到着した順(indexIdの昇順)に1件ずつ返します。
+        最後に返したindexIdを記録して続きから取得するため、各トランザクションはちょうど1回だけ返されます。
+        新着がない間はポーリング間隔を max_interval まで延ばし、新着があれば min_interval に戻します。
+
+        Args:
+            indexId_start (Optional[int], optional): このindexId以降を返します。省略した場合は呼び出し後の新着のみを返します。
+            page_size (int, optional): 1回のリクエストで取得する件数。 Defaults to 100.
+            min_interval (float, optional): ポーリング間隔の最小値(秒)。 Defaults to 0.2.
+            max_interval (float, optional): ポーリング間隔の最大値(秒)。 Defaults to 5.0.
+            backoff (float, optional): 新着がなかったときにポーリング間隔を延ばす倍率。 Defaults to 2.0.
+            stop (Optional[threading.Event], optional): セットされると監視を終了します。
+        """
+        params = {
+            "limit": page_size,
+            "offset": 0,
+            "sort_by": "indexId",
+            "sort_order": "ASC",
+        }
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            timestamp_start=timestamp_start, timestamp_end=timestamp_end, is_contract=is_contract
+        ))
+        if indexId_start is None:
+            latest = self._get("/transactions", {"limit": 1, "offset": 0, "sort_by": "indexId", "sort_order": "DESC"})
+            indexId_start = latest[0]['indexId'] + 1 if latest else 0
+        params["indexId_start"] = indexId_start
+
+        interval = min_interval
+        while stop is None or not stop.is_set():
+            page = self._get("/transactions", params=params, binary=True)
+            for tx in self._decode_transactions("/transactions", page):
+                yield tx
+            if len(page):
+                params["indexId_start"] = _last_index_id(page) + 1
+            interval = _next_poll_interval(interval, len(page), page_size, min_interval, max_interval, backoff)
+            if interval:
+                if stop is None:
+                    time.sleep(interval)
+                elif stop.wait(interval):
+                    return
     
+    def _fetch_index_range(
+        self,
+        start: int,
+        end: int,
+        page_size: int,
+        as_batch: bool = False
+    ) -> List[List[pigeonium.Transaction]|TransactionBatch]:
+        """indexIdが start〜end (両端を含む) のトランザクションをページのリストとして取得します。"""
+        pages = []
+        cursor = start
+        while cursor <= end:
+            params = {
+                "limit": page_size,
+                "offset": 0,
+                "sort_by": "indexId",
+                "sort_order": "ASC",
+                "indexId_start": cursor,
+                "indexId_end": end,
+            }
+            rows = self._get("/transactions", params=params, binary=True)
+            if len(rows):
+                pages.append(self._decode_transactions("/transactions", rows, as_batch))
+                cursor = _last_index_id(rows) + 1
+            if len(rows) < page_size:
+                break
+        return pages
+
+    def scan_transactions(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        shards: int = 4,
+        shard_size: Optional[int] = None,
+        page_size: int = 500,
+        checkpoint: Optional[str] = None,
+        as_batch: bool = False
+    ) -> Iterator[pigeonium.Transaction|TransactionBatch]:
+        """
+        indexIdの範囲を shard_size ごとの区間に分け、最大 shards 区間を並列に取得して、indexIdの昇順に返します。
+        メモリに保持するのは処理中の区間を含めて最大 shards + 1 区間分です。
+
+        checkpoint を指定すると、区間を返し終えるたびに最後のindexIdをそのファイルに記録し、
+        同じ start で再実行したときは続きから再開します。中断時点の区間は再度返される場合があります。
+
+        Args:
+            start (int, optional): 取得を開始するindexId。 Defaults to 0.
+            end (Optional[int], optional): 取得を終了するindexId(これを含む)。省略した場合は現在の最新のindexId。
+            shards (int, optional): 並列に取得する区間の数。 Defaults to 4.
+            shard_size (Optional[int], optional): 1区間のindexIdの幅。省略した場合は page_size * 4。
+            page_size (int, optional): 1回のリクエストで取得する件数。 Defaults to 500.
+            checkpoint (Optional[str], optional): 進捗を記録するJSONファイルのパス。
+            as_batch (bool, optional): Trueの場合、ページごとの TransactionBatch を返します。 Defaults to False.
+        """
+        if end is None:
+            latest = self._get("/transactions", {"limit": 1, "offset": 0, "sort_by": "indexId", "sort_order": "DESC"})
+            if not latest:
+                return
+            end = latest[0]['indexId']
+        scan_start = start
+        if checkpoint:
+            try:
+                with open(checkpoint, encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get('start') == scan_start and saved.get('last') is not None:
+                    start = saved['last'] + 1
+            except (OSError, ValueError):
+                pass
+        shard_size = shard_size or page_size * 4
+        ranges = iter([(s, min(s + shard_size - 1, end)) for s in range(start, end + 1, shard_size)])
+        window: Deque[Tuple[int, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=shards, thread_name_prefix="pigeonium-scan") as executor:
+            def fill() -> None:
+                while len(window) < shards:
+                    shard = next(ranges, None)
+                    if shard is None:
+                        return
+                    window.append((shard[1], executor.submit(self._fetch_index_range, shard[0], shard[1], page_size, as_batch)))
+
+            fill()
+            try:
+                while window:
+                    shard_end, future = window.popleft()
+                    pages = future.result()
+                    fill()
+                    for page in pages:
+                        if as_batch:
+                            yield page
+                        else:
+                            yield from page
+                    if checkpoint:
+                        _write_json_atomic(checkpoint, {'start': scan_start, 'last': shard_end})
+            finally:
+                for _, future in window:
+                    future.cancel()
+    
+    def verify_transactions(
+        self,
+        transactions: List[pigeonium.Transaction]|TransactionBatch,
+        chunk_size: int = 256
+    ) -> SignatureBitmap:
+        """
+        トランザクションの署名を検証します。
+        chunk_size 件を超える場合は、クライアントが保持するプロセスプールで chunk_size 件ずつ並列に検証します。
+        それ以下の場合は、このクライアントのネットワーク設定を pigeonium.Config に反映した状態で呼び出し元のスレッドで検証します。
+
+        Args:
+            transactions (List[pigeonium.Transaction]|TransactionBatch): 検証するトランザクション。
+            chunk_size (int, optional): 1回のプロセス間通信で検証する件数。 Defaults to 256.
+
+        Returns:
+            SignatureBitmap: transactionsと同じ順序の検証結果。
+        """
+        # pigeonium_verify.verify_transactions と同じく8の倍数に切り上げ、プロセスプールを使うかどうかの判定を揃えます。
+        chunk_size = max(8, (chunk_size + 7) // 8 * 8)
+        if len(transactions) > chunk_size:
+            return verify_transactions(transactions, self.verifier, self._worker_pool(), chunk_size=chunk_size)
+        with self.config.activate():
+            return verify_transactions(transactions, self.verifier, chunk_size=chunk_size)
+
+    def _check_signatures(self, transactions: List[pigeonium.Transaction]|TransactionBatch) -> None:
+        bitmap = self.verify_transactions(transactions)
+        invalid = bitmap.invalid_indexes()
+        if invalid:
+            if isinstance(transactions, TransactionBatch):
+                raise InvalidSignatureError([transactions.indexId[i] for i in invalid])
+            raise InvalidSignatureError([transactions[i].indexId for i in invalid])
+
     def send_transaction(
         self,
         source_wallet: pigeonium.Wallet,
@@ -240,7 +1718,8 @@ class PigeoniumClient:
         currency_id: bytes,
         amount: int,
         fee_amount: int = 0,
-        input_data: bytes = b''
+        input_data: bytes = b'',
+        retry: bool = False
     ) -> pigeonium.Transaction:
         """
         通貨を送信するトランザクションを作成し、ネットワークにブロードキャストします。
@@ -252,33 +1731,93 @@ class PigeoniumClient:
             amount (int): 送信量 (最小単位)。
             fee_amount (int, optional): 手数料。 Defaults to 0.
             input_data (bytes, optional): トランザクションに含める追加データ。 Defaults to b''.
+            retry (bool, optional): Trueの場合、retry_policyに従って再送します。
+                再送前に同じ署名のトランザクションが受理済みでないかを確認します。 Defaults to False.
 
         Returns:
             pigeonium.Transaction: サーバーから返された実行後のトランザクション情報。
         """
-        tx = pigeonium.Transaction.create(
-            source=source_wallet,
-            dest=bytes.fromhex(dest_address.hex()),
-            currencyId=bytes.fromhex(currency_id.hex()),
-            amount=amount,
-            feeAmount=fee_amount,
-            inputData=input_data
-        )
+        config = self.config
+        start = time.perf_counter()
+        with config.activate():
+            payload = _transaction_payload(source_wallet, dest_address, currency_id, amount, fee_amount, input_data)
+        if self.hooks:
+            self._emit_signing("send_transaction", start)
 
-        payload = {
-            "source": source_wallet.address.hex(),
-            "dest": dest_address.hex(),
-            "currencyId": currency_id.hex(),
-            "amount": amount,
-            "feeAmount": fee_amount,
-            "inputData": input_data.hex(),
-            "publicKey": source_wallet.publicKey.hex(),
-            "signature": tx.signature.hex(),
-        }
+        duplicate_key = (payload["source"], payload["signature"]) if retry else None
+        response = self._post("/transaction", payload, duplicate_key)
 
-        response = self._post("/transaction", payload)
+        return self._decode_transaction("/transaction", response)
+    
+    def send_transactions(
+        self,
+        batch: Iterable[Dict[str, Any]],
+        max_in_flight: int = 8,
+        chunk_size: int = 64
+    ) -> List[TransactionResult]:
+        """
+        複数のトランザクションをまとめて送信します。
+        署名はクライアントが保持するプロセスプールで並列に行い、署名済みのものから順に最大 max_in_flight 件を同時にPOSTします。
+        署名のため、各ウォレットの秘密鍵はワーカープロセスに渡されます。署名時間はチャンクごとにフックへ通知します。
+
+        Args:
+            batch (Iterable[Dict[str, Any]]): send_transactionのキーワード引数
+                (source_wallet, dest_address, currency_id, amount, fee_amount, input_data) の辞書の列。
+            max_in_flight (int, optional): 同時に送信するリクエスト数の上限。 Defaults to 8.
+            chunk_size (int, optional): 1回のプロセス間通信で署名する件数。 Defaults to 64.
+
+        Returns:
+            List[TransactionResult]: batchと同じ順序の結果。失敗した項目はerrorに例外が設定されます。
+        """
+        items = list(batch)
+        results: List[Optional[TransactionResult]] = [None] * len(items)
+        if not items:
+            return []
+
+        chunks: List[Tuple[List[int], List[Tuple[bytes, bytes, bytes, int, int, bytes]]]] = []
+        for start in range(0, len(items), chunk_size):
+            indexes, args = [], []
+            for i in range(start, min(start + chunk_size, len(items))):
+                item = items[i]
+                try:
+                    args.append((
+                        item["source_wallet"].privateKey,
+                        item["dest_address"],
+                        item["currency_id"],
+                        item["amount"],
+                        item.get("fee_amount", 0),
+                        item.get("input_data", b''),
+                    ))
+                    indexes.append(i)
+                except Exception as e:
+                    results[i] = TransactionResult(error=e)
+            if args:
+                chunks.append((indexes, args))
 
-        return pigeonium.Transaction.fromHexDict(response)
+        signer = self._worker_pool()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as sender:
+            sign_futures = [(indexes, signer.submit(_sign_payloads, args)) for indexes, args in chunks]
+            post_futures = []
+            for indexes, sign_future in sign_futures:
+                try:
+                    signed, seconds = sign_future.result()
+                except Exception as e:
+                    for i in indexes:
+                        results[i] = TransactionResult(error=e)
+                    continue
+                for hook in self.hooks:
+                    hook.on_signing("send_transactions", seconds)
+                for i, payload in zip(indexes, signed):
+                    if isinstance(payload, Exception):
+                        results[i] = TransactionResult(error=payload)
+                    else:
+                        post_futures.append((i, sender.submit(self._post, "/transaction", payload)))
+            for i, post_future in post_futures:
+                try:
+                    results[i] = TransactionResult(self._decode_transaction("/transaction", post_future.result()))
+                except Exception as e:
+                    results[i] = TransactionResult(error=e)
+        return results
     
     def IterableTransaction(
         self,
@@ -293,37 +1832,38 @@ class PigeoniumClient:
         timestamp_end: Optional[int] = None,
         is_contract: Optional[bool] = None,
         sort_order: Literal["ASC", "DESC"] = "DESC",
-    ):
+        page_size: int = 20,
+        prefetch: int = 1,
+        as_batch: bool = False,
+        verify: bool = False
+    ) -> IterableTransaction:
+        """
+        条件に一致するトランザクションを1件ずつ返すイテレータを作成します。
+
+        Args:
+            page_size (int, optional): 1回のリクエストで取得する件数。 Defaults to 20.
+            prefetch (int, optional): バックグラウンドで先読みするページ数。0で先読みしません。 Defaults to 1.
+            as_batch (bool, optional): Trueの場合、ページごとの TransactionBatch を返します。 Defaults to False.
+            verify (bool, optional): Trueの場合、ページごとに署名を検証し、正しくないものが含まれていれば
+                InvalidSignatureError を送出します。 Defaults to False.
+        """
         params = {
-            "limit": 20,
+            "limit": page_size,
             "sort_by": "indexId",
             "sort_order": sort_order,
         }
-        if address:
-            params["address"] = address.hex()
-        if source:
-            params["source"] = source.hex()
-        if dest:
-            params["dest"] = dest.hex()
-        if currencyId:
-            params["currencyId"] = currencyId.hex()
-        if amount_min is not None:
-            params["amount_min"] = amount_min
-        if amount_max is not None:
-            params["amount_max"] = amount_max
-        if timestamp_start is not None:
-            params["timestamp_start"] = timestamp_start
-        if timestamp_end is not None:
-            params["timestamp_end"] = timestamp_end
-        if is_contract is not None:
-            params["is_contract"] = is_contract
+        params.update(_transaction_filter_params(
+            address, source, dest, currencyId, amount_min, amount_max,
+            timestamp_start=timestamp_start, timestamp_end=timestamp_end, is_contract=is_contract
+        ))
         
-        return IterableTransaction(self, params, indexId_start, sort_order)
+        return IterableTransaction(self, params, indexId_start, sort_order, page_size, prefetch, as_batch, verify)
 
     def deploy_contract(
         self,
         sender_wallet: pigeonium.Wallet,
-        script: str
+        script: str,
+        retry: bool = False
     ) -> pigeonium.Transaction:
         """
         スマートコントラクトをネットワークにデプロイします。
@@ -332,52 +1872,32 @@ class PigeoniumClient:
         Args:
             sender_wallet (pigeonium.Wallet): デプロイ費用を支払うウォレット。
             script (str): スマートコントラクトのソースコード。
+            retry (bool, optional): Trueの場合、retry_policyに従って再送します。
+                再送前にデプロイトランザクションが受理済みでないかを確認します。 Defaults to False.
 
         Returns:
             pigeonium.Transaction: サーバーから返されたデプロイトランザクションの情報。
         """
-        contract = pigeonium.Contract(script)
-        base_currency_id = pigeonium.Config.BaseCurrency.currencyId
-
-        deploy_tx = pigeonium.Transaction.create(
-            source=sender_wallet,
-            dest=bytes(16),
-            currencyId=base_currency_id,
-            amount=contract.deployCost,
-            feeAmount=0,
-            inputData=contract.address
-        )
-
-        script_hash = pigeonium.Utils.sha3_256(script.encode())
-        script_signature = sender_wallet.sign(script_hash)
-
-        payload = {
-            "sender": sender_wallet.address.hex(),
-            "script": script,
-            "publicKey": sender_wallet.publicKey.hex(),
-            "signature": script_signature.hex(),
-            "deployTransaction": {
-                "source": sender_wallet.address.hex(),
-                "dest": "00" * 16,
-                "currencyId": base_currency_id.hex(),
-                "amount": contract.deployCost,
-                "feeAmount": 0,
-                "inputData": contract.address.hex(),
-                "publicKey": sender_wallet.publicKey.hex(),
-                "signature": deploy_tx.signature.hex(),
-            }
-        }
+        config = self.config
+        start = time.perf_counter()
+        with config.activate():
+            payload = _contract_payload(sender_wallet, script, config)
+        if self.hooks:
+            self._emit_signing("deploy_contract", start)
 
-        response = self._post("/contract", payload)
-        return pigeonium.Transaction.fromHexDict(response)
+        deploy_tx = payload["deployTransaction"]
+        duplicate_key = (deploy_tx["source"], deploy_tx["signature"]) if retry else None
+        response = self._post("/contract", payload, duplicate_key)
+        return self._decode_transaction("/contract", response)
 
 
 if __name__ == '__main__':    
     # クライアントの初期化
     API_URL = "https://pigeonium.h4ribote.net/server"
     client = PigeoniumClient(API_URL)
+    print(f"ネットワーク '{client.config.network_name}' (ID: {client.config.network_id}) に接続しました。")
 
-    base_currency_id = pigeonium.Config.BaseCurrency.currencyId
+    base_currency_id = client.config.base_currency.currencyId
 
     # ウォレットの準備
     wallet1 = client.generate_wallet()
@@ -393,6 +1913,7 @@ if __name__ == '__main__':
     # 例A: 残高の確認
     print("\n--- 残高確認 ---")
     bals = client.get_balances(wallet1.address)
+    client.warm_currency_cache(bals)
     if bals:
         for bal_cu_id in bals.keys():
             cu = client.get_currency(bal_cu_id)
@@ -0,0 +1,447 @@
+import builtins
+import hashlib
+import time
+import types
+import pigeonium
+from pigeonium.error import CanselTransaction
+from typing import Optional, Dict, Literal, List, Any, Iterable, Tuple, Callable
+
+from pigeonium_client import PigeoniumClient
+
+_MISSING = object()
+
+def make_transaction(**fields: Any) -> pigeonium.Transaction:
+    """指定した属性を持つpigeonium.Transactionを作成します。"""
+    tx = pigeonium.Transaction()
+    for key, value in fields.items():
+        setattr(tx, key, value)
+    return tx
+
+class Ledger:
+    """
+    コントラクトの実行に使うメモリ上の台帳。
+    残高・コントラクト変数・通貨・トランザクション履歴を保持し、
+    実行が失敗した場合は journal を使って変更を取り消します。
+    """
+
+    def __init__(self, base_currency: Optional[pigeonium.Currency] = None, next_index_id: int = 1):
+        self.balances: Dict[Tuple[bytes, bytes], int] = {}
+        self.variables: Dict[Tuple[bytes, bytes], bytes] = {}
+        self.currencies: Dict[bytes, pigeonium.Currency] = {}
+        self.transactions: Dict[int, pigeonium.Transaction] = {}
+        self.next_index_id = next_index_id
+        self.base_currency = base_currency
+        if base_currency is not None:
+            self.currencies[base_currency.currencyId] = base_currency
+        self._journal: Optional[List[Tuple[Dict, Any, Any]]] = None
+
+    # 変更の記録と取り消し
+
+    def begin(self) -> None:
+        self._journal = []
+
+    def commit(self) -> None:
+        self._journal = None
+
+    def rollback(self) -> None:
+        journal, self._journal = self._journal, None
+        for table, key, old in reversed(journal or []):
+            if old is _MISSING:
+                table.pop(key, None)
+            else:
+                table[key] = old
+
+    def _write(self, table: Dict, key: Any, value: Any) -> None:
+        if self._journal is not None:
+            self._journal.append((table, key, table.get(key, _MISSING)))
+        if value is _MISSING:
+            table.pop(key, None)
+        else:
+            table[key] = value
+
+    # 残高
+
+    def get_balance(self, address: bytes, currency_id: bytes) -> int:
+        return self.balances.get((address, currency_id), 0)
+
+    def set_balance(self, address: bytes, currency_id: bytes, amount: int) -> None:
+        self._write(self.balances, (address, currency_id), amount)
+
+    def move(self, source: bytes, dest: bytes, currency_id: bytes, amount: int, enforce: bool = True) -> None:
+        """sourceからdestへamountを移動します。enforce=Trueの場合、残高不足ならValueError。"""
+        if amount < 0:
+            raise ValueError("amount must not be negative")
+        balance = self.get_balance(source, currency_id)
+        if enforce and balance < amount:
+            raise ValueError(f"insufficient balance: {source.hex()} has {balance}, needs {amount}")
+        self.set_balance(source, currency_id, balance - amount)
+        self.set_balance(dest, currency_id, self.get_balance(dest, currency_id) + amount)
+
+    # コントラクト変数
+
+    def get_variable(self, address: bytes, key: bytes) -> Optional[bytes]:
+        return self.variables.get((address, key))
+
+    def set_variable(self, address: bytes, key: bytes, value: Optional[bytes]) -> None:
+        self._write(self.variables, (address, key), _MISSING if value is None else value)
+
+    # 通貨とトランザクション
+
+    def put_currency(self, currency: pigeonium.Currency) -> None:
+        self._write(self.currencies, currency.currencyId, currency)
+
+    def find_currency(
+        self,
+        currency_id: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> Optional[pigeonium.Currency]:
+        if currency_id:
+            return self.currencies.get(currency_id)
+        for cu in self.currencies.values():
+            if (name and cu.name == name) or (symbol and cu.symbol == symbol) or (issuer and cu.issuer == issuer):
+                return cu
+        return None
+
+    def record(self, **fields: Any) -> pigeonium.Transaction:
+        """次のindexIdでトランザクションを履歴に追加します。"""
+        fields.setdefault("feeAmount", 0)
+        fields.setdefault("inputData", b"")
+        fields.setdefault("timestamp", int(time.time()))
+        index_id = self.next_index_id
+        tx = make_transaction(indexId=index_id, **fields)
+        self._write(self.transactions, index_id, tx)
+        self.next_index_id = index_id + 1
+        if self._journal is not None:
+            self._journal.append((self.__dict__, "next_index_id", index_id))
+        return tx
+
+    def seed_from_client(
+        self,
+        client: PigeoniumClient,
+        addresses: Iterable[bytes],
+        currency_ids: Iterable[bytes] = (),
+        variables: Optional[Dict[bytes, Iterable[bytes]]] = None
+    ) -> None:
+        """
+        APIサーバーから残高と通貨情報を読み込み、台帳の初期状態にします。
+
+        Args:
+            client (PigeoniumClient): 読み込みに使うクライアント。
+            addresses (Iterable[bytes]): 残高を読み込むアドレス(コントラクトのアドレスを含む)。
+            currency_ids (Iterable[bytes], optional): 残高がなくても読み込む通貨のID。
+            variables (Optional[Dict[bytes, Iterable[bytes]]], optional): コントラクトのアドレス -> 読み込む変数のキー。
+        """
+        if self.base_currency is None:
+            self.base_currency = client.config.base_currency
+            self.currencies[self.base_currency.currencyId] = self.base_currency
+        wanted = set(currency_ids)
+        for address in addresses:
+            for cu_id, amount in client.get_balances(address).items():
+                self.balances[(address, cu_id)] = amount
+                wanted.add(cu_id)
+            cu = client.get_currency(issuer=address)
+            if cu is not None:
+                self.currencies[cu.currencyId] = cu
+        for cu_id, cu in client.warm_currency_cache(dict.fromkeys(wanted - self.currencies.keys(), 0)).items():
+            if cu is not None:
+                self.currencies[cu_id] = cu
+        for address, keys in (variables or {}).items():
+            for key, value in client.get_variables(address, keys).items():
+                if value is not None:
+                    self.variables[(address, key)] = value
+        latest = client.get_transactions(limit=1)
+        if latest:
+            self.next_index_id = max(self.next_index_id, latest[0].indexId + 1)
+
+class ExecutionResult:
+    """ContractEngine.executeの結果。"""
+
+    __slots__ = ("transaction", "generated", "error", "cancelled", "seconds")
+
+    def __init__(
+        self,
+        transaction: pigeonium.Transaction,
+        generated: List[pigeonium.Transaction],
+        error: Optional[BaseException],
+        seconds: float
+    ):
+        self.transaction = transaction
+        self.generated = generated
+        self.error = error
+        self.cancelled = isinstance(error, CanselTransaction)
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"ExecutionResult(indexId={self.transaction.indexId}, generated={len(self.generated)}, {state})"
+
+class ContractRuntime:
+    """
+    funcHint.py で宣言されたコントラクトAPIの実装。
+    1つのコントラクトにつき1つ作成され、execute のたびに transaction を差し替えて使われます。
+    """
+
+    API_NAMES = (
+        "hex2bytes", "sha256", "sha3_256", "sha3_512",
+        "getBalance", "getCurrency", "getSelfCurrency", "getTransaction", "getTransactions",
+        "getVariable", "setVariable", "delVariable",
+        "transfer", "burn", "mint", "createCurrency", "nextIndexId",
+    )
+
+    def __init__(self, ledger: Ledger, address: bytes, enforce_balances: bool = True):
+        self.ledger = ledger
+        self.address = address
+        self.enforce_balances = enforce_balances
+        self.transaction: Optional[pigeonium.Transaction] = None
+        self.generated: List[pigeonium.Transaction] = []
+        self.func_hint: Optional[types.ModuleType] = None
+        self.builtins: Optional[Dict[str, Any]] = None
+
+    def api(self) -> Dict[str, Callable]:
+        """コントラクトの名前空間に公開する関数。"""
+        return {name: getattr(self, name) for name in self.API_NAMES}
+
+    def _emit(self, **fields: Any) -> pigeonium.Transaction:
+        tx = self.ledger.record(timestamp=self.transaction.timestamp, **fields)
+        self.generated.append(tx)
+        return tx
+
+    def _self_currency(self) -> pigeonium.Currency:
+        cu = self.getSelfCurrency()
+        if cu is None:
+            raise ValueError("contract has not created a currency")
+        return cu
+
+    def hex2bytes(self, hex: str, length: Optional[int] = None) -> bytes:
+        value = bytes.fromhex(hex)
+        if length is not None and len(value) != length:
+            raise ValueError(f"expected {length} bytes, got {len(value)}")
+        return value
+
+    def sha256(self, string: bytes) -> bytes:
+        return hashlib.sha256(string).digest()
+
+    def sha3_256(self, string: bytes) -> bytes:
+        return hashlib.sha3_256(string).digest()
+
+    def sha3_512(self, string: bytes) -> bytes:
+        return hashlib.sha3_512(string).digest()
+
+    def getBalance(self, address: bytes, currencyId: bytes) -> int:
+        return self.ledger.get_balance(address, currencyId)
+
+    def getCurrency(
+        self,
+        currencyId: Optional[bytes] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        issuer: Optional[bytes] = None
+    ) -> pigeonium.Currency|None:
+        return self.ledger.find_currency(currencyId, name, symbol, issuer)
+
+    def getSelfCurrency(self) -> pigeonium.Currency|None:
+        return self.ledger.find_currency(issuer=self.address)
+
+    def getTransaction(self, indexId: int) -> pigeonium.Transaction|None:
+        return self.ledger.transactions.get(indexId)
+
+    def getTransactions(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        isContract: Optional[bool] = None,
+        sort_by: Literal["indexId", "timestamp", "amount", "feeAmount"] = "indexId",
+        sort_order: Literal["ASC", "DESC"] = "DESC",
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[pigeonium.Transaction]:
+        def match(tx: pigeonium.Transaction) -> bool:
+            return ((address is None or address in (tx.source, tx.dest))
+                    and (source is None or tx.source == source)
+                    and (dest is None or tx.dest == dest)
+                    and (currencyId is None or tx.currencyId == currencyId)
+                    and (amount_min is None or tx.amount >= amount_min)
+                    and (amount_max is None or tx.amount <= amount_max)
+                    and (timestamp_start is None or tx.timestamp >= timestamp_start)
+                    and (timestamp_end is None or tx.timestamp <= timestamp_end)
+                    and (isContract is None or bool(getattr(tx, "isContract", False)) == isContract))
+        txs = sorted(filter(match, self.ledger.transactions.values()),
+                     key=lambda tx: (getattr(tx, sort_by), tx.indexId), reverse=sort_order == "DESC")
+        return txs[offset:offset + limit]
+
+    def getVariable(self, address: bytes, varKey: bytes) -> bytes|None:
+        return self.ledger.get_variable(address, varKey)
+
+    def setVariable(self, varKey: bytes, varValue: bytes|None) -> None:
+        self.ledger.set_variable(self.address, varKey, varValue)
+
+    def delVariable(self, varKey: bytes) -> None:
+        self.ledger.set_variable(self.address, varKey, None)
+
+    def transfer(self, dest: bytes, currencyId: bytes, amount: int) -> pigeonium.Transaction:
+        self.ledger.move(self.address, dest, currencyId, amount, self.enforce_balances)
+        return self._emit(source=self.address, dest=dest, currencyId=currencyId, amount=amount)
+
+    def burn(self, amount: int) -> pigeonium.Transaction:
+        cu = self._self_currency()
+        self.ledger.move(self.address, bytes(16), cu.currencyId, amount, self.enforce_balances)
+        self.ledger.set_balance(bytes(16), cu.currencyId, 0)
+        self.ledger.put_currency(_with_supply(cu, cu.supply - amount))
+        return self._emit(source=self.address, dest=bytes(16), currencyId=cu.currencyId, amount=amount)
+
+    def mint(self, amount: int) -> pigeonium.Transaction:
+        cu = self._self_currency()
+        self.ledger.set_balance(self.address, cu.currencyId, self.ledger.get_balance(self.address, cu.currencyId) + amount)
+        self.ledger.put_currency(_with_supply(cu, cu.supply + amount))
+        return self._emit(source=bytes(16), dest=self.address, currencyId=cu.currencyId, amount=amount)
+
+    def createCurrency(self, name: str, symbol: str, supply: int) -> pigeonium.Transaction:
+        if self.getSelfCurrency() is not None:
+            raise ValueError("contract has already created a currency")
+        if self.ledger.find_currency(name=name) or self.ledger.find_currency(symbol=symbol):
+            raise ValueError("currency name or symbol already exists")
+        cu = pigeonium.Currency()
+        cu.currencyId = hashlib.sha3_256(self.address + name.encode() + symbol.encode()).digest()[:16]
+        cu.name = name
+        cu.symbol = symbol
+        cu.issuer = self.address
+        cu.supply = supply
+        self.ledger.put_currency(cu)
+        self.ledger.set_balance(self.address, cu.currencyId, supply)
+        return self._emit(source=bytes(16), dest=self.address, currencyId=cu.currencyId, amount=supply)
+
+    def nextIndexId(self) -> int:
+        return self.ledger.next_index_id
+
+def _with_supply(cu: pigeonium.Currency, supply: int) -> pigeonium.Currency:
+    updated = pigeonium.Currency()
+    updated.currencyId, updated.name, updated.symbol, updated.issuer = cu.currencyId, cu.name, cu.symbol, cu.issuer
+    updated.supply = supply
+    return updated
+
+class ContractEngine:
+    """
+    コントラクトのスクリプトをローカルの Ledger に対して実行するエンジン。
+    コンパイル済みのコードはスクリプトのハッシュごとにキャッシュされるため、
+    同じコントラクトに大量の合成トランザクションを高速に流して負荷試験や what-if 分析ができます。
+
+    使用例:
+        engine = ContractEngine(Ledger(base_currency))
+        engine.register(contract_address, open("sampleScript.py").read())
+        result = engine.execute(source=user, dest=contract_address, currencyId=cu_id, amount=100)
+    """
+
+    runtime_class = ContractRuntime
+
+    def __init__(self, ledger: Ledger, enforce_balances: bool = True):
+        """
+        Args:
+            ledger (Ledger): 実行に使う台帳。
+            enforce_balances (bool): Falseの場合、残高不足でも送金を許可します(残高は負になります)。
+        """
+        self.ledger = ledger
+        self.enforce_balances = enforce_balances
+        self.contracts: Dict[bytes, Tuple[types.CodeType, ContractRuntime]] = {}
+        self._code_cache: Dict[bytes, types.CodeType] = {}
+
+    def compile(self, script: str) -> types.CodeType:
+        """スクリプトをコンパイルします。同じ内容のスクリプトはキャッシュ済みのコードを返します。"""
+        script_hash = hashlib.sha3_256(script.encode()).digest()
+        code = self._code_cache.get(script_hash)
+        if code is None:
+            code = self._code_cache[script_hash] = compile(script, f"<contract {script_hash[:8].hex()}>", "exec")
+        return code
+
+    def register(self, address: bytes, script: str) -> None:
+        """addressのコントラクトとしてscriptを登録します。"""
+        self.contracts[address] = (self.compile(script), self.runtime_class(self.ledger, address, self.enforce_balances))
+
+    def _namespace(self, runtime: ContractRuntime, transaction: pigeonium.Transaction) -> Dict[str, Any]:
+        namespace = runtime.api()
+        namespace.update(
+            transaction=transaction,
+            inputData=transaction.inputData,
+            selfAddress=runtime.address,
+            baseCurrency=self.ledger.base_currency,
+            CanselTransaction=CanselTransaction,
+        )
+        # スクリプト先頭の "from funcHint import *" がこの名前空間を指すようにします。
+        func_hint = types.ModuleType("funcHint")
+        func_hint.__dict__.update(namespace)
+        runtime.func_hint = func_hint
+        namespace["__builtins__"] = self._builtins(runtime)
+        return namespace
+
+    @staticmethod
+    def _builtins(runtime: ContractRuntime) -> Dict[str, Any]:
+        """funcHintのimportを runtime.func_hint に差し替えた組み込み関数の辞書。コントラクトごとに1回だけ作成します。"""
+        if runtime.builtins is None:
+            def _import(name, globals=None, locals=None, fromlist=(), level=0):
+                if name == "funcHint":
+                    return runtime.func_hint
+                return builtins.__import__(name, globals, locals, fromlist, level)
+
+            runtime.builtins = dict(builtins.__dict__, __import__=_import)
+        return runtime.builtins
+
+    def _run(self, code: types.CodeType, namespace: Dict[str, Any]) -> None:
+        exec(code, namespace)
+
+    def execute(
+        self,
+        source: bytes,
+        dest: bytes,
+        currencyId: bytes,
+        amount: int,
+        feeAmount: int = 0,
+        inputData: bytes = b"",
+        timestamp: Optional[int] = None
+    ) -> ExecutionResult:
+        """
+        トランザクションを台帳に適用し、宛先がコントラクトならスクリプトを実行します。
+        スクリプトが例外(CanselTransactionを含む)を送出した場合は、そのトランザクションによる変更をすべて取り消します。
+        """
+        start = time.perf_counter()
+        ledger = self.ledger
+        ledger.begin()
+        contract = self.contracts.get(dest)
+        tx = ledger.record(
+            source=source, dest=dest, currencyId=currencyId, amount=amount, feeAmount=feeAmount,
+            inputData=inputData, timestamp=int(time.time()) if timestamp is None else timestamp,
+            isContract=contract is not None,
+        )
+        generated: List[pigeonium.Transaction] = []
+        error: Optional[BaseException] = None
+        try:
+            ledger.move(source, dest, currencyId, amount, self.enforce_balances)
+            if feeAmount:
+                ledger.move(source, bytes(16), currencyId, feeAmount, self.enforce_balances)
+                ledger.set_balance(bytes(16), currencyId, 0)
+            if contract is not None:
+                code, runtime = contract
+                runtime.transaction = tx
+                runtime.generated = generated
+                self._run(code, self._namespace(runtime, tx))
+        except Exception as e:
+            error = e
+            ledger.rollback()
+            generated = []
+        else:
+            ledger.commit()
+        return ExecutionResult(tx, generated, error, time.perf_counter() - start)
+
+    def replay(self, transactions: Iterable[Dict[str, Any]]) -> List[ExecutionResult]:
+        """execute のキーワード引数の辞書の列を順に実行します。"""
+        return [self.execute(**fields) for fields in transactions]
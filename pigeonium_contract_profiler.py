@@ -0,0 +1,180 @@
+import sys
+import time
+import types
+from collections import deque
+from typing import Optional, Dict, List, Any, Callable, Deque
+
+from pigeonium_contract_engine import ContractEngine, ContractRuntime, ExecutionResult, Ledger
+
+class ContractProfile:
+    """
+    コントラクト実行の計測結果。
+    api: API名 -> [呼び出し回数, 合計秒数]
+    lines: 行番号 -> [実行回数, 合計秒数] (行から呼んだAPIの時間を含みます)
+    storage: setVariableのキー -> 書き込んだバイト数の合計
+    """
+
+    def __init__(self):
+        self.api: Dict[str, List[float]] = {}
+        self.lines: Dict[int, List[float]] = {}
+        self.storage: Dict[bytes, int] = {}
+        self.transactions = 0
+        self.seconds = 0.0
+
+    def merge(self, other: "ContractProfile") -> "ContractProfile":
+        """otherの計測結果をこのプロファイルに加算します。"""
+        for table, other_table in ((self.api, other.api), (self.lines, other.lines)):
+            for key, (count, seconds) in other_table.items():
+                entry = table.setdefault(key, [0, 0.0])
+                entry[0] += count
+                entry[1] += seconds
+        for key, written in other.storage.items():
+            self.storage[key] = self.storage.get(key, 0) + written
+        self.transactions += other.transactions
+        self.seconds += other.seconds
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "transactions": self.transactions,
+            "seconds": self.seconds,
+            "api": {name: {"calls": int(c), "seconds": s} for name, (c, s) in self.api.items()},
+            "lines": {lineno: {"hits": int(c), "seconds": s} for lineno, (c, s) in sorted(self.lines.items())},
+            "storage_bytes": {key.hex(): written for key, written in self.storage.items()},
+        }
+
+    def format(self, source: Optional[str] = None, top: int = 10) -> str:
+        """人が読むためのレポート。sourceを渡すと行ごとの集計にソースコードを添えます。"""
+        source_lines = source.splitlines() if source else []
+        per_tx = max(self.transactions, 1)
+        out = [f"transactions: {self.transactions}  total: {self.seconds * 1000:.3f} ms  "
+               f"per tx: {self.seconds / per_tx * 1e6:.1f} us", "", "API calls (by total time):"]
+        for name, (count, seconds) in sorted(self.api.items(), key=lambda kv: -kv[1][1]):
+            out.append(f"  {name:<18} {int(count):>9} calls  {seconds * 1000:>10.3f} ms  {count / per_tx:>7.2f} /tx")
+        out += ["", "Lines (by total time):"]
+        for lineno, (count, seconds) in sorted(self.lines.items(), key=lambda kv: -kv[1][1])[:top]:
+            text = source_lines[lineno - 1].strip() if 0 < lineno <= len(source_lines) else ""
+            out.append(f"  {lineno:>4} {int(count):>9} hits  {seconds * 1000:>10.3f} ms  {text}")
+        out += ["", "Storage writes (by bytes):"]
+        for key, written in sorted(self.storage.items(), key=lambda kv: -kv[1])[:top]:
+            out.append(f"  {key.hex():<34} {written:>9} bytes")
+        return "\n".join(out)
+
+class ProfilingRuntime(ContractRuntime):
+    """API呼び出しの回数・時間と setVariable の書き込み量を current_profile に記録する ContractRuntime。"""
+
+    def __init__(self, ledger: Ledger, address: bytes, enforce_balances: bool = True):
+        super().__init__(ledger, address, enforce_balances)
+        self.current_profile = ContractProfile()
+        self._api: Optional[Dict[str, Callable]] = None
+
+    def api(self) -> Dict[str, Callable]:
+        if self._api is None:
+            self._api = {name: self._timed(name, fn) for name, fn in super().api().items()}
+        return self._api
+
+    def _timed(self, name: str, fn: Callable) -> Callable:
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry = self.current_profile.api.setdefault(name, [0, 0.0])
+                entry[0] += 1
+                entry[1] += perf_counter() - start
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+
+    def setVariable(self, varKey: bytes, varValue: bytes|None) -> None:
+        super().setVariable(varKey, varValue)
+        if varValue is not None:
+            storage = self.current_profile.storage
+            storage[varKey] = storage.get(varKey, 0) + len(varValue)
+
+class ProfilingContractEngine(ContractEngine):
+    """
+    コントラクトの実行をトランザクションごとに計測する ContractEngine。
+    API呼び出しと setVariable の書き込み量に加えて、sys.settrace でスクリプトの各行の実行回数と時間を記録します。
+    行の計測はスクリプト自身のフレームだけを対象にしますが、通常の実行より大幅に遅くなります。
+
+    使用例:
+        engine = ProfilingContractEngine(ledger)
+        engine.register(address, script)
+        engine.replay(transactions)
+        print(engine.report(address).format(script))
+    """
+
+    runtime_class = ProfilingRuntime
+
+    def __init__(self, ledger: Ledger, enforce_balances: bool = True, trace_lines: bool = True, keep_profiles: int = 1000):
+        """
+        Args:
+            trace_lines (bool): Falseの場合、行ごとの計測を行いません(API呼び出しと書き込み量のみ)。
+            keep_profiles (int): トランザクションごとのプロファイルを保持する件数(新しいものから)。
+        """
+        super().__init__(ledger, enforce_balances)
+        self.trace_lines = trace_lines
+        self.profiles: Deque[ContractProfile] = deque(maxlen=keep_profiles)
+        self._aggregate: Dict[bytes, ContractProfile] = {}
+        self._current: Optional[ProfilingRuntime] = None
+
+    def _run(self, code: types.CodeType, namespace: Dict[str, Any]) -> None:
+        if not self.trace_lines:
+            super()._run(code, namespace)
+            return
+        lines = self._current.current_profile.lines
+        filename = code.co_filename
+        perf_counter = time.perf_counter
+        last: List[Any] = [None, 0.0]
+
+        def flush(now: float) -> None:
+            if last[0] is not None:
+                entry = lines.setdefault(last[0], [0, 0.0])
+                entry[0] += 1
+                entry[1] += now - last[1]
+
+        def local_trace(frame, event, arg):
+            if event == "line":
+                now = perf_counter()
+                flush(now)
+                last[0] = frame.f_lineno
+                last[1] = now
+            return local_trace
+
+        def global_trace(frame, event, arg):
+            return local_trace if frame.f_code.co_filename == filename else None
+
+        previous = sys.gettrace()
+        sys.settrace(global_trace)
+        try:
+            super()._run(code, namespace)
+        finally:
+            sys.settrace(previous)
+            flush(perf_counter())
+
+    def execute(self, source: bytes, dest: bytes, *args, **kwargs) -> ExecutionResult:
+        contract = self.contracts.get(dest)
+        if contract is None:
+            return super().execute(source, dest, *args, **kwargs)
+        runtime: ProfilingRuntime = contract[1]
+        runtime.current_profile = profile = ContractProfile()
+        self._current = runtime
+        result = super().execute(source, dest, *args, **kwargs)
+        profile.transactions = 1
+        profile.seconds = result.seconds
+        self.profiles.append(profile)
+        self._aggregate.setdefault(dest, ContractProfile()).merge(profile)
+        return result
+
+    def report(self, address: Optional[bytes] = None) -> ContractProfile:
+        """コントラクトごと(addressを省略した場合は全コントラクト)の集計結果。"""
+        if address is not None:
+            return self._aggregate.get(address, ContractProfile())
+        total = ContractProfile()
+        for profile in self._aggregate.values():
+            total.merge(profile)
+        return total
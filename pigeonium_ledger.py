@@ -0,0 +1,171 @@
+import random
+import threading
+import pigeonium
+from typing import Optional, Dict, List, Iterable
+
+from pigeonium_batch import TransactionBatch
+from pigeonium_client import PigeoniumClient
+
+ZERO_ADDRESS = bytes(16)
+
+class BalanceDrift:
+    """check_drift で見つかった、ローカルの残高とサーバーの残高の不一致。"""
+
+    __slots__ = ("address", "currencyId", "local", "remote")
+
+    def __init__(self, address: bytes, currencyId: bytes, local: int, remote: int):
+        self.address = address
+        self.currencyId = currencyId
+        self.local = local
+        self.remote = remote
+
+    def __repr__(self) -> str:
+        return (f"BalanceDrift(address={self.address.hex()}, currencyId={self.currencyId.hex()}, "
+                f"local={self.local}, remote={self.remote})")
+
+class BalanceLedger:
+    """
+    トランザクションをindexIdの昇順に適用して作る、アドレス×通貨の残高表。
+    送信元から amount + feeAmount を引き、宛先に amount を足します(手数料は送信する通貨で支払われます)。
+    発行・焼却・手数料の受け皿であるゼロアドレスの残高は保持しません。
+    sync() は前回適用したindexIdの続きだけを取得するため、繰り返し呼ぶことで最新の状態に追従できます。
+    残高の参照は通信を行わず、辞書の参照だけで完了します。スレッドセーフです。
+
+    使用例:
+        ledger = BalanceLedger()
+        ledger.sync(client)
+        amount = ledger.get_balance(address, client.config.base_currency.currencyId)
+    """
+
+    def __init__(self):
+        self.balances: Dict[bytes, Dict[bytes, int]] = {}
+        self.last_index_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _add(self, address: bytes, currency_id: bytes, amount: int) -> None:
+        if address == ZERO_ADDRESS or not amount:
+            return
+        balances = self.balances.get(address)
+        if balances is None:
+            balances = self.balances[address] = {}
+        balances[currency_id] = balances.get(currency_id, 0) + amount
+
+    def apply(self, transactions: Iterable[pigeonium.Transaction]|TransactionBatch) -> int:
+        """
+        トランザクションを残高表に適用します。適用済みのindexId以下のものは無視します。
+
+        Args:
+            transactions (Iterable[pigeonium.Transaction]|TransactionBatch): indexIdの昇順に並んだトランザクション。
+
+        Returns:
+            int: 適用したトランザクションの件数。
+        """
+        if isinstance(transactions, TransactionBatch):
+            if not len(transactions):
+                return 0
+            rows = zip(transactions.indexId, transactions.source, transactions.dest,
+                       transactions.currencyId, transactions.amount, transactions.feeAmount)
+        else:
+            rows = ((tx.indexId, tx.source, tx.dest, tx.currencyId, tx.amount, tx.feeAmount) for tx in transactions)
+        applied = 0
+        with self._lock:
+            last_index_id = self.last_index_id
+            for index_id, source, dest, currency_id, amount, fee_amount in rows:
+                if last_index_id is not None and index_id <= last_index_id:
+                    continue
+                self._add(source, currency_id, -(amount + fee_amount))
+                self._add(dest, currency_id, amount)
+                last_index_id = index_id
+                applied += 1
+            self.last_index_id = last_index_id
+        return applied
+
+    def sync(self, client: PigeoniumClient, page_size: int = 500, prefetch: int = 1) -> int:
+        """
+        前回適用したトランザクションより新しいものをサーバーから取得して適用します。
+
+        Args:
+            client (PigeoniumClient): 取得に使うクライアント。
+            page_size (int, optional): 1回のリクエストで取得する件数。 Defaults to 500.
+            prefetch (int, optional): 先読みするページ数。 Defaults to 1.
+
+        Returns:
+            int: 新たに適用したトランザクションの件数。
+        """
+        start = self.last_index_id + 1 if self.last_index_id is not None else None
+        pages = client.IterableTransaction(
+            indexId_start=start, sort_order="ASC", page_size=page_size, prefetch=prefetch, as_batch=True
+        )
+        try:
+            return sum(self.apply(page) for page in pages)
+        finally:
+            pages.close()
+
+    def follow(self, client: PigeoniumClient, stop: Optional[threading.Event] = None, **watch_options) -> None:
+        """
+        sync() で追いついた後、watch_transactions で新着のトランザクションを適用し続けます。
+        stop がセットされるまで戻りません。watch_options は watch_transactions にそのまま渡します。
+        """
+        self.sync(client)
+        start = self.last_index_id + 1 if self.last_index_id is not None else 0
+        for tx in client.watch_transactions(indexId_start=start, stop=stop, **watch_options):
+            self.apply((tx,))
+
+    def get_balance(self, address: bytes, currency_id: bytes) -> int:
+        """指定されたアドレスの単一の通貨残高を返します。"""
+        with self._lock:
+            return self.balances.get(address, {}).get(currency_id, 0)
+
+    def get_balances(self, address: bytes) -> Dict[bytes, int]:
+        """指定されたアドレスの残高が0でない通貨の残高を返します。"""
+        with self._lock:
+            return {cu_id: amount for cu_id, amount in self.balances.get(address, {}).items() if amount}
+
+    def addresses(self) -> List[bytes]:
+        with self._lock:
+            return list(self.balances)
+
+    def _compare(self, client: PigeoniumClient, addresses: List[bytes], max_workers: int) -> List[BalanceDrift]:
+        drifts = []
+        for address, remote in client.get_balances_many(addresses, max_workers=max_workers):
+            if isinstance(remote, Exception):
+                continue
+            local = self.get_balances(address)
+            for cu_id in local.keys() | remote.keys():
+                if local.get(cu_id, 0) != remote.get(cu_id, 0):
+                    drifts.append(BalanceDrift(address, cu_id, local.get(cu_id, 0), remote.get(cu_id, 0)))
+        return drifts
+
+    def check_drift(
+        self,
+        client: PigeoniumClient,
+        sample: int = 100,
+        addresses: Optional[Iterable[bytes]] = None,
+        max_workers: int = 16
+    ) -> List[BalanceDrift]:
+        """
+        いくつかのアドレスについてサーバーの残高(get_balances)と比較し、不一致を返します。
+        比較中に届いたトランザクションによる一時的な不一致を除くため、
+        不一致があったアドレスはもう一度 sync() してから再確認し、それでも一致しないものだけを返します。
+        取得に失敗したアドレスは比較の対象から外します。
+
+        Args:
+            client (PigeoniumClient): 比較に使うクライアント。
+            sample (int, optional): addressesを省略した場合に、残高表から無作為に選ぶアドレスの数。 Defaults to 100.
+            addresses (Optional[Iterable[bytes]], optional): 比較するアドレス。
+            max_workers (int, optional): 同時に発行するリクエスト数の上限。 Defaults to 16.
+
+        Returns:
+            List[BalanceDrift]: 一致しなかった残高のリスト。空なら一致しています。
+        """
+        if addresses is None:
+            known = self.addresses()
+            targets = random.sample(known, min(sample, len(known)))
+        else:
+            targets = list(addresses)
+        self.sync(client)
+        drifts = self._compare(client, targets, max_workers)
+        if not drifts:
+            return []
+        self.sync(client)
+        return self._compare(client, list(dict.fromkeys(d.address for d in drifts)), max_workers)
@@ -0,0 +1,222 @@
+import threading
+from bisect import bisect_left
+from typing import Optional, Dict, List, Any, Tuple
+
+class RequestEvent:
+    """1回のAPI呼び出し(再試行を含む)の計測結果。"""
+
+    __slots__ = ("method", "endpoint", "status", "latency", "bytes_sent", "bytes_received", "retries", "error")
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        status: Optional[int],
+        latency: float,
+        bytes_sent: int,
+        bytes_received: int,
+        retries: int,
+        error: Optional[BaseException] = None
+    ):
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.latency = latency
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (f"RequestEvent({self.method} {self.endpoint} status={self.status} "
+                f"latency={self.latency:.6f} retries={self.retries})")
+
+class ClientHook:
+    """
+    PigeoniumClientの計測フック。必要なメソッドだけをオーバーライドして client.add_hook() で登録します。
+    フックはリクエストを処理したスレッドから呼ばれるため、スレッドセーフに実装してください。
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        """APIリクエストが完了(または失敗)したときに呼ばれます。"""
+
+    def on_decode(self, endpoint: str, seconds: float, count: int) -> None:
+        """レスポンスのトランザクションをデコードしたときに呼ばれます。"""
+
+    def on_signing(self, operation: str, seconds: float) -> None:
+        """send_transaction / deploy_contract で署名したとき、send_transactions ではチャンクを署名するごとに呼ばれます。"""
+
+class Histogram:
+    """Prometheus形式の固定バケットヒストグラム。"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, 累積件数) のリスト。最後の要素は "+Inf" です。"""
+        result, total = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            result.append((_format_number(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """バケット境界から求めた q (0〜1) 分位点の上限値。"""
+        if not self.count:
+            return None
+        rank, total = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(self.cumulative()),
+        }
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{int(value)}.0"
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items())
+
+class ClientMetrics(ClientHook):
+    """
+    リクエストごとの計測値をプロセス内のヒストグラムとカウンタに集計するフック。
+    1件あたりの処理はロック1回とバケットの二分探索だけなので、本番環境で常時有効にできます。
+
+    使用例:
+        metrics = ClientMetrics()
+        client.add_hook(metrics)
+        ...
+        print(metrics.to_prometheus())
+    """
+
+    LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    DECODE_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+    def __init__(self, prefix: str = "pigeonium_client"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._retries: Dict[Tuple[str, str], int] = {}
+        self._bytes_sent: Dict[Tuple[str, str], int] = {}
+        self._bytes_received: Dict[Tuple[str, str], int] = {}
+        self._decode: Dict[str, Histogram] = {}
+        self._decoded: Dict[str, int] = {}
+        self._signing: Dict[str, Histogram] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        key = (event.method, event.endpoint)
+        status = str(event.status) if event.status is not None else type(event.error).__name__ if event.error else "none"
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self.LATENCY_BUCKETS)
+            histogram.observe(event.latency)
+            self._requests[key + (status,)] = self._requests.get(key + (status,), 0) + 1
+            self._retries[key] = self._retries.get(key, 0) + event.retries
+            self._bytes_sent[key] = self._bytes_sent.get(key, 0) + event.bytes_sent
+            self._bytes_received[key] = self._bytes_received.get(key, 0) + event.bytes_received
+
+    def on_decode(self, endpoint: str, seconds: float, count: int) -> None:
+        with self._lock:
+            histogram = self._decode.get(endpoint)
+            if histogram is None:
+                histogram = self._decode[endpoint] = Histogram(self.DECODE_BUCKETS)
+            histogram.observe(seconds)
+            self._decoded[endpoint] = self._decoded.get(endpoint, 0) + count
+
+    def on_signing(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._signing.get(operation)
+            if histogram is None:
+                histogram = self._signing[operation] = Histogram(self.DECODE_BUCKETS)
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        """集計値をすべて破棄します。"""
+        with self._lock:
+            for values in (self._latency, self._requests, self._retries, self._bytes_sent,
+                           self._bytes_received, self._decode, self._decoded, self._signing):
+                values.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の集計値を辞書で返します。"""
+        with self._lock:
+            requests = {}
+            for (method, endpoint), histogram in self._latency.items():
+                key = (method, endpoint)
+                requests[f"{method} {endpoint}"] = {
+                    "latency": histogram.to_dict(),
+                    "status": {status: n for (m, e, status), n in self._requests.items() if (m, e) == key},
+                    "retries": self._retries.get(key, 0),
+                    "bytes_sent": self._bytes_sent.get(key, 0),
+                    "bytes_received": self._bytes_received.get(key, 0),
+                }
+            return {
+                "requests": requests,
+                "decode": {
+                    endpoint: dict(histogram.to_dict(), transactions=self._decoded.get(endpoint, 0))
+                    for endpoint, histogram in self._decode.items()
+                },
+                "signing": {operation: histogram.to_dict() for operation, histogram in self._signing.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """現在の集計値をPrometheusのテキスト形式で返します。"""
+        p = self.prefix
+        lines: List[str] = []
+
+        def histogram_lines(name: str, help_text: str, histograms: Dict[Any, Histogram], label_names: Tuple[str, ...]) -> None:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} histogram")
+            for key, histogram in sorted(histograms.items()):
+                values = key if isinstance(key, tuple) else (key,)
+                labels = _labels(**dict(zip(label_names, values)))
+                for le, n in histogram.cumulative():
+                    lines.append(f'{p}_{name}_bucket{{{labels},le="{le}"}} {n}')
+                lines.append(f"{p}_{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{p}_{name}_count{{{labels}}} {histogram.count}")
+
+        def counter_lines(name: str, help_text: str, counters: Dict[Any, int], label_names: Tuple[str, ...]) -> None:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} counter")
+            for key, n in sorted(counters.items()):
+                values = key if isinstance(key, tuple) else (key,)
+                lines.append(f"{p}_{name}{{{_labels(**dict(zip(label_names, values)))}}} {n}")
+
+        with self._lock:
+            histogram_lines("request_duration_seconds", "API request latency including retries.",
+                            self._latency, ("method", "endpoint"))
+            counter_lines("requests_total", "API requests by final status.",
+                          self._requests, ("method", "endpoint", "status"))
+            counter_lines("request_retries_total", "Retried attempts.", self._retries, ("method", "endpoint"))
+            counter_lines("request_sent_bytes_total", "Request body bytes sent.", self._bytes_sent, ("method", "endpoint"))
+            counter_lines("request_received_bytes_total", "Response body bytes received.",
+                          self._bytes_received, ("method", "endpoint"))
+            histogram_lines("decode_duration_seconds", "Time spent decoding transactions.", self._decode, ("endpoint",))
+            counter_lines("decoded_transactions_total", "Transactions decoded.", self._decoded, ("endpoint",))
+            histogram_lines("signing_duration_seconds", "Time spent signing.", self._signing, ("operation",))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import pigeonium
+from typing import Optional, Literal, List, Dict, Any
+
+from pigeonium_client import PigeoniumClient
+
+class TransactionStore:
+    """
+    取得したトランザクションをSQLiteに保存するローカルストア。
+    sync() は前回までに保存した最大のindexIdより新しいトランザクションだけを取得し、
+    query() は get_transactions と同じ条件でローカルの索引から検索します(通信は発生しません)。
+
+    使用例:
+        with TransactionStore("transactions.db") as store:
+            store.sync(client)
+            txs = store.query(source=wallet.address, sort_order="ASC", limit=None)
+    """
+
+    _SORT_COLUMNS = ("indexId", "timestamp", "amount", "feeAmount")
+
+    def __init__(self, path: str = "pigeonium_transactions.db"):
+        """
+        Args:
+            path (str): SQLiteデータベースファイルのパス。":memory:" でメモリ上に作成します。
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                indexId INTEGER PRIMARY KEY,
+                source BLOB NOT NULL,
+                dest BLOB NOT NULL,
+                currencyId BLOB NOT NULL,
+                amount INTEGER NOT NULL,
+                feeAmount INTEGER NOT NULL,
+                timestamp INTEGER,
+                isContract INTEGER,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_transactions_source ON transactions (source, indexId);
+            CREATE INDEX IF NOT EXISTS idx_transactions_dest ON transactions (dest, indexId);
+            CREATE INDEX IF NOT EXISTS idx_transactions_currency ON transactions (currencyId, indexId);
+            CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);
+            CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp);
+        """)
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @property
+    def last_index_id(self) -> Optional[int]:
+        """保存済みのトランザクションの最大のindexId。空の場合はNone。"""
+        return self.conn.execute("SELECT MAX(indexId) FROM transactions").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def add(self, txs: List[Dict[str, Any]]) -> None:
+        """APIが返す形式(16進数文字列の辞書)のトランザクションを保存します。"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        tx['indexId'],
+                        bytes.fromhex(tx['source']),
+                        bytes.fromhex(tx['dest']),
+                        bytes.fromhex(tx['currencyId']),
+                        tx['amount'],
+                        tx['feeAmount'],
+                        tx.get('timestamp'),
+                        None if tx.get('isContract') is None else int(bool(tx['isContract'])),
+                        json.dumps(tx),
+                    )
+                    for tx in txs
+                ]
+            )
+
+    def sync(self, client: PigeoniumClient, page_size: int = 500) -> int:
+        """
+        サーバーから未取得のトランザクションを古い順に取得して保存します。
+        ページごとにコミットするため、途中で中断しても次回は続きから再開します。
+
+        Args:
+            client (PigeoniumClient): 取得に使うクライアント。
+            page_size (int, optional): 1回のリクエストで取得する件数。 Defaults to 500.
+
+        Returns:
+            int: 新たに保存したトランザクションの件数。
+        """
+        synced = 0
+        last_index_id = self.last_index_id
+        while True:
+            params = {
+                "limit": page_size,
+                "offset": 0,
+                "sort_by": "indexId",
+                "sort_order": "ASC",
+            }
+            if last_index_id is not None:
+                params["indexId_start"] = last_index_id + 1
+            page = client._get("/transactions", params=params)
+            if not page:
+                break
+            self.add(page)
+            synced += len(page)
+            last_index_id = page[-1]['indexId']
+            if len(page) < page_size:
+                break
+        return synced
+
+    def query(
+        self,
+        address: Optional[bytes] = None,
+        source: Optional[bytes] = None,
+        dest: Optional[bytes] = None,
+        currencyId: Optional[bytes] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        indexId_start: Optional[int] = None,
+        indexId_end: Optional[int] = None,
+        timestamp_start: Optional[int] = None,
+        timestamp_end: Optional[int] = None,
+        is_contract: Optional[bool] = None,
+        sort_by: Literal["indexId", "timestamp", "amount", "feeAmount"] = "indexId",
+        sort_order: Literal["ASC", "DESC"] = "DESC",
+        limit: Optional[int] = 20,
+        offset: int = 0
+    ) -> List[pigeonium.Transaction]:
+        """
+        保存済みのトランザクションを PigeoniumClient.get_transactions と同じ条件で検索します。
+        limit=None で件数を制限しません。
+        """
+        if sort_by not in self._SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {self._SORT_COLUMNS}")
+        if sort_order not in ("ASC", "DESC"):
+            raise ValueError("sort_order must be 'ASC' or 'DESC'")
+
+        where, args = [], []
+        if address:
+            where.append("(source = ? OR dest = ?)")
+            args += [address, address]
+        if source:
+            where.append("source = ?")
+            args.append(source)
+        if dest:
+            where.append("dest = ?")
+            args.append(dest)
+        if currencyId:
+            where.append("currencyId = ?")
+            args.append(currencyId)
+        for column, op, value in (
+            ("amount", ">=", amount_min),
+            ("amount", "<=", amount_max),
+            ("indexId", ">=", indexId_start),
+            ("indexId", "<=", indexId_end),
+            ("timestamp", ">=", timestamp_start),
+            ("timestamp", "<=", timestamp_end),
+        ):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        if is_contract is not None:
+            where.append("isContract = ?")
+            args.append(int(is_contract))
+
+        sql = "SELECT data FROM transactions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {sort_by} {sort_order}, indexId {sort_order}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            args += [-1 if limit is None else limit, offset]
+        return [pigeonium.Transaction.fromHexDict(json.loads(row[0])) for row in self.conn.execute(sql, args)]
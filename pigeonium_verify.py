@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Dict, List, Any, Iterator, Sequence, Tuple
+
+import pigeonium
+
+from pigeonium_batch import TransactionBatch
+
+try:
+    from ecdsa import BadSignatureError
+    _SIGNATURE_ERRORS: Tuple[type, ...] = (BadSignatureError,)
+except ImportError:
+    _SIGNATURE_ERRORS = ()
+
+class SignatureVerifier:
+    """
+    トランザクションの署名を検証します。
+    公開鍵から作るオブジェクトは load_key で作成され、プロセスごとにキャッシュされます。
+    署名方式を変える場合は load_key と verify をオーバーライドしてください。
+    verify が False を返すか、signature_errors の例外を送出した場合は署名が正しくないものとして扱います。
+    それ以外の例外(実装の誤りなど)は呼び出し元にそのまま伝わります。
+    プロセスプールに渡すため、サブクラスはpickle可能にしてください。
+    """
+
+    signature_errors: Tuple[type, ...] = _SIGNATURE_ERRORS
+
+    def load_key(self, public_key: bytes) -> Any:
+        """公開鍵から検証用のオブジェクトを作成します。"""
+        return pigeonium.Wallet.fromPublic(public_key)
+
+    def verify(self, key: Any, tx: pigeonium.Transaction) -> bool:
+        """公開鍵が送信元アドレスのものであり、署名が正しい場合にTrueを返します。"""
+        return key.address == tx.source and key.verifySignature(tx.signature, tx.signData())
+
+class InvalidSignatureError(ValueError):
+    """取得したトランザクションに署名が正しくないものが含まれていた場合の例外。"""
+
+    def __init__(self, index_ids: List[int]):
+        super().__init__(f"invalid signature: indexId {', '.join(map(str, index_ids))}")
+        self.index_ids = index_ids
+
+class SignatureBitmap:
+    """
+    検証結果を1件1ビットで保持するビットマップ。i番目のビットが1なら i番目のトランザクションの署名は正しいです。
+    """
+
+    __slots__ = ("bits", "_length")
+
+    def __init__(self, bits: bytearray, length: int):
+        self.bits = bits
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> bool:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("SignatureBitmap index out of range")
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def __iter__(self) -> Iterator[bool]:
+        for i in range(self._length):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"SignatureBitmap(valid={self.valid_count}/{self._length})"
+
+    @property
+    def valid_count(self) -> int:
+        return sum(bin(b).count("1") for b in self.bits)
+
+    def all_valid(self) -> bool:
+        return self.valid_count == self._length
+
+    def invalid_indexes(self) -> List[int]:
+        """署名が正しくないトランザクションの位置のリスト。"""
+        return [i for i in range(self._length) if not self[i]]
+
+_KEY_CACHE_SIZE = 4096
+_key_cache: Dict[Tuple[type, bytes], Any] = {}
+_key_cache_lock = threading.Lock()
+
+def _cached_key(verifier: SignatureVerifier, public_key: bytes) -> Any:
+    cache_key = (type(verifier), public_key)
+    key = _key_cache.get(cache_key)
+    if key is None:
+        key = verifier.load_key(public_key)
+        with _key_cache_lock:
+            if len(_key_cache) >= _KEY_CACHE_SIZE:
+                _key_cache.clear()
+            _key_cache[cache_key] = key
+    return key
+
+def _verify_chunk(verifier: SignatureVerifier, items: Sequence[pigeonium.Transaction]|TransactionBatch) -> bytearray:
+    """items の検証結果をビットマップで返します。"""
+    if isinstance(items, TransactionBatch):
+        items = items.to_list()
+    signature_errors = verifier.signature_errors
+    bits = bytearray((len(items) + 7) // 8)
+    for i, tx in enumerate(items):
+        try:
+            valid = verifier.verify(_cached_key(verifier, tx.publicKey), tx)
+        except signature_errors:
+            valid = False
+        if valid:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+def verify_transactions(
+    transactions: Sequence[pigeonium.Transaction]|TransactionBatch,
+    verifier: Optional[SignatureVerifier] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256
+) -> SignatureBitmap:
+    """
+    トランザクションの署名を chunk_size 件ずつプロセスプールで検証します。
+    件数が chunk_size 以下の場合は、プロセス間通信を避けて呼び出し元のプロセスで検証します。
+
+    Args:
+        transactions (Sequence[pigeonium.Transaction]|TransactionBatch): 検証するトランザクション。
+        verifier (Optional[SignatureVerifier], optional): 検証方法。省略した場合は SignatureVerifier()。
+        executor (Optional[Executor], optional): 使用するプール。省略した場合はこの呼び出しの間だけプロセスプールを作成します。
+        max_workers (Optional[int], optional): executorを省略した場合のプロセス数。Noneの場合はCPU数。
+        chunk_size (int, optional): 1回のプロセス間通信で検証する件数。8の倍数に切り上げます。 Defaults to 256.
+
+    Returns:
+        SignatureBitmap: transactionsと同じ順序の検証結果。
+    """
+    verifier = verifier or SignatureVerifier()
+    chunk_size = max(8, (chunk_size + 7) // 8 * 8)
+    length = len(transactions)
+    if length <= chunk_size:
+        return SignatureBitmap(_verify_chunk(verifier, transactions), length)
+
+    # チャンクの境界を8の倍数に揃えているため、各チャンクのビットマップはそのまま連結できます。
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return verify_transactions(transactions, verifier, pool, chunk_size=chunk_size)
+    # TransactionBatch は列のバッファを切り出したまま渡し、ワーカーで直接pigeonium.Transactionにします。
+    if isinstance(transactions, TransactionBatch):
+        chunks = [transactions.take(i, i + chunk_size) for i in range(0, length, chunk_size)]
+    else:
+        chunks = [transactions[i:i + chunk_size] for i in range(0, length, chunk_size)]
+    return SignatureBitmap(bytearray().join(executor.map(_verify_chunk, [verifier] * len(chunks), chunks)), length)
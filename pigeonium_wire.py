@@ -0,0 +1,120 @@
+"""
+トランザクションのページを列ごとにまとめたバイナリ形式。
+APIの16進数文字列のJSONと比べて、アドレスやIDは半分のサイズになり、デコード時の bytes.fromhex も不要になります。
+
+形式 (整数はすべてリトルエンディアン):
+    b"PGTX" | version: u8 | 件数: u32 | 列数: u16
+    列ごとに: 名前の長さ: u8 | 名前(UTF-8) | 型: u8 | データ
+        b"q": int64 の配列 (件数 * 8 バイト)
+        b"F": 要素のバイト数: u32 | 固定長のバイト列を連結したもの
+        b"V": 各要素の開始位置: u64 * (件数 + 1) | 可変長のバイト列を連結したもの
+        b"j": バイト数: u32 | JSONの配列 (64ビットに収まらない整数や真偽値など)
+"""
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, List, Any
+
+from pigeonium_batch import BytesColumn, TransactionBatch
+
+CONTENT_TYPE = "application/x-pigeonium-transactions"
+ACCEPT = f"{CONTENT_TYPE}, application/json;q=0.9"
+
+_MAGIC = b"PGTX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBIH")
+_U32 = struct.Struct("<I")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+def _le_bytes(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _le_array(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+def encode_batch(batch: TransactionBatch) -> bytes:
+    """TransactionBatch をバイナリ形式にエンコードします。"""
+    length = len(batch)
+    columns = dict(batch.columns, **batch.extra)
+    out = [_HEADER.pack(_MAGIC, _VERSION, length, len(columns))]
+    for name, column in columns.items():
+        encoded_name = name.encode()
+        out.append(bytes((len(encoded_name),)) + encoded_name)
+        if isinstance(column, BytesColumn):
+            if column.offsets is None:
+                out += [b"F", _U32.pack(column.width), column.buffer]
+            else:
+                out += [b"V", _le_bytes(array('Q', column.offsets)), column.buffer]
+        elif isinstance(column, array) and column.typecode == 'q':
+            out += [b"q", _le_bytes(column)]
+        else:
+            data = json.dumps(list(column), separators=(",", ":")).encode()
+            out += [b"j", _U32.pack(len(data)), data]
+    return b"".join(out)
+
+def encode_transactions(rows: List[Dict[str, Any]]) -> bytes:
+    """APIの形式(16進数文字列の辞書)のトランザクションのリストをバイナリ形式にエンコードします。"""
+    return encode_batch(TransactionBatch.from_hex_dicts(rows))
+
+def _read(view: memoryview, pos: int, size: int) -> memoryview:
+    if pos + size > len(view):
+        raise ValueError("truncated pigeonium transaction page")
+    return view[pos:pos + size]
+
+def decode_transactions(data: bytes) -> TransactionBatch:
+    """
+    バイナリ形式のページを TransactionBatch にデコードします。
+    途中で途切れている場合や、列のサイズが件数と合わない場合、末尾に余分なデータがある場合は ValueError を送出します。
+    """
+    view = memoryview(data)
+    magic, version, length, count = _HEADER.unpack(_read(view, 0, _HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not a pigeonium transaction page")
+    pos = _HEADER.size
+    columns: Dict[str, Any] = {}
+    extra: Dict[str, List[Any]] = {}
+    for _ in range(count):
+        name_length = _read(view, pos, 1)[0]
+        name = bytes(_read(view, pos + 1, name_length)).decode()
+        pos += 1 + name_length
+        kind = bytes(_read(view, pos, 1))
+        pos += 1
+        if kind == b"q":
+            columns[name] = _le_array('q', _read(view, pos, length * 8))
+            pos += length * 8
+        elif kind == b"F":
+            (width,) = _U32.unpack(_read(view, pos, 4))
+            pos += 4
+            columns[name] = BytesColumn(bytes(_read(view, pos, width * length)), length, width=width)
+            pos += width * length
+        elif kind == b"V":
+            offsets = _le_array('Q', _read(view, pos, (length + 1) * 8))
+            pos += (length + 1) * 8
+            if offsets[0] != 0 or any(a > b for a, b in zip(offsets, offsets[1:])):
+                raise ValueError(f"invalid offsets in column {name!r}")
+            columns[name] = BytesColumn(bytes(_read(view, pos, offsets[-1])), length, offsets=offsets)
+            pos += offsets[-1]
+        elif kind == b"j":
+            (size,) = _U32.unpack(_read(view, pos, 4))
+            pos += 4
+            values = json.loads(bytes(_read(view, pos, size)))
+            pos += size
+            if not isinstance(values, list) or len(values) != length:
+                raise ValueError(f"column {name!r} does not have {length} values")
+            if name in TransactionBatch.INT_FIELDS:
+                columns[name] = values
+            else:
+                extra[name] = values
+        else:
+            raise ValueError(f"unknown column type {kind!r}")
+    if pos != len(view):
+        raise ValueError(f"{len(view) - pos} bytes of trailing data after pigeonium transaction page")
+    return TransactionBatch(columns, length, extra)
@@ -0,0 +1,51 @@
+import random
+
+import pigeonium
+import pytest
+
+import pigeonium_wire
+from pigeonium_batch import TransactionBatch
+
+def _rows(count: int, rng: random.Random) -> list:
+    return [{
+        "indexId": i + 1,
+        "source": rng.randbytes(16).hex(),
+        "dest": rng.randbytes(16).hex(),
+        "currencyId": rng.randbytes(16).hex(),
+        "amount": rng.randrange(10 ** 12),
+        "feeAmount": rng.randrange(1000),
+        "inputData": rng.randbytes(rng.choice((0, 4, 33))).hex(),
+        "publicKey": rng.randbytes(64).hex(),
+        "signature": rng.randbytes(64).hex(),
+        "timestamp": 1700000000 + i,
+        "isContract": bool(i % 2),
+    } for i in range(count)]
+
+def _batches(rows: list) -> list:
+    return [
+        TransactionBatch.from_hex_dicts(rows),
+        pigeonium_wire.decode_transactions(pigeonium_wire.encode_transactions(rows)),
+    ]
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_rows_match_from_hex_dict(count):
+    rows = _rows(count, random.Random(count))
+    expected = [pigeonium.Transaction.fromHexDict(row).__dict__ for row in rows]
+    for batch in _batches(rows):
+        assert [batch[i].__dict__ for i in range(count)] == expected
+        assert [tx.__dict__ for tx in batch.to_list()] == expected
+        assert [tx.__dict__ for tx in batch] == expected
+        assert all(type(tx) is pigeonium.Transaction for tx in batch)
+
+def test_take_matches_rows():
+    rows = _rows(30, random.Random(0))
+    for batch in _batches(rows):
+        part = batch.take(5, 17)
+        assert [part.row_dict(i) for i in range(len(part))] == rows[5:17]
+        assert [tx.__dict__ for tx in part] == [pigeonium.Transaction.fromHexDict(row).__dict__ for row in rows[5:17]]
+
+def test_empty_batch_has_columns():
+    for batch in _batches([]):
+        assert len(batch) == 0
+        assert list(batch.amount) == [] and batch.source.to_list() == []
+        assert batch.to_list() == [] and batch[0:5] == []
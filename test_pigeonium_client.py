@@ -0,0 +1,56 @@
+import json
+import random
+
+import pytest
+
+from pigeonium_client import _iter_json_array
+
+SAMPLES = [
+    [],
+    [0, 1, -1, 1.5, 1e3, -2.5E-3, 12345678901234567890],
+    [True, False, None],
+    ["", "a,b", "]", "\"quoted\"", "日本語", "\\\\"],
+    [{"indexId": 1, "source": "00" * 16, "amount": 10}, {"nested": [1, [2, {"x": "y"}]]}],
+    [[], {}, [[]], ""],
+]
+
+def _split(data: bytes, rng: random.Random) -> list:
+    cuts = sorted(rng.sample(range(1, len(data)), min(len(data) - 1, rng.randint(0, 8)))) if len(data) > 1 else []
+    return [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+
+@pytest.mark.parametrize("value", SAMPLES)
+@pytest.mark.parametrize("indent", [None, 1])
+def test_random_chunk_boundaries(value, indent):
+    data = json.dumps(value, indent=indent, ensure_ascii=False).encode()
+    rng = random.Random(len(data))
+    for _ in range(300):
+        assert list(_iter_json_array(_split(data, rng))) == value
+
+@pytest.mark.parametrize("value", SAMPLES)
+def test_every_single_split(value):
+    data = json.dumps(value, ensure_ascii=False).encode()
+    for i in range(len(data) + 1):
+        assert list(_iter_json_array([data[:i], data[i:]])) == value
+
+def test_one_byte_chunks():
+    value = SAMPLES[1] + SAMPLES[3] + SAMPLES[4]
+    data = json.dumps(value, ensure_ascii=False).encode()
+    assert list(_iter_json_array(data[i:i + 1] for i in range(len(data)))) == value
+
+@pytest.mark.parametrize("chunks", [[b"[1e", b"3]"], [b"[1.", b"5]"], [b"[-", b"2]"], [b"[tr", b"ue]"], [b"[1", b"0", b"]"]])
+def test_scalar_split_at_chunk_boundary(chunks):
+    assert list(_iter_json_array(chunks)) == json.loads(b"".join(chunks))
+
+@pytest.mark.parametrize("data", [b"[1,]", b"[,1]", b"[1,,2]", b"[1 2]", b"[1x]", b"[tru]", b"{}", b"[1}", b"[@]"])
+def test_malformed(data):
+    with pytest.raises(ValueError) as excinfo:
+        list(_iter_json_array([data]))
+    assert "incomplete" not in str(excinfo.value)
+
+@pytest.mark.parametrize("data", [b"", b"[", b"[1", b"[1,", b"[\"abc", b"[{\"a\": 1"])
+def test_incomplete(data):
+    with pytest.raises(ValueError, match="incomplete"):
+        list(_iter_json_array([data]))
+
+def test_stops_at_closing_bracket():
+    assert list(_iter_json_array([b"[1, 2]", b"trailing"])) == [1, 2]
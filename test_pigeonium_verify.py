@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pigeonium
+import pytest
+
+from pigeonium_batch import TransactionBatch
+from pigeonium_client import NetworkConfig, _init_signing_worker, _transaction_payload
+from pigeonium_verify import SignatureVerifier, verify_transactions
+
+NETWORK_INFO = {
+    "networkName": "TestNet",
+    "networkId": 7,
+    "contractDeployCost": 1000,
+    "adminPublicKey": "02" * 64,
+    "baseCurrency": {
+        "currencyId": "00" * 16,
+        "name": "Pigeon",
+        "symbol": "PGN",
+        "issuer": "00" * 15 + "01",
+        "supply": 10 ** 18,
+    },
+}
+
+@pytest.fixture
+def config() -> NetworkConfig:
+    return NetworkConfig(NETWORK_INFO)
+
+def _signed_rows(config: NetworkConfig, count: int) -> list:
+    """send_transaction と同じ方法で署名し、APIが返す形式の辞書にします。"""
+    wallet = pigeonium.Wallet.generate()
+    dest = pigeonium.Wallet.generate().address
+    rows = []
+    with config.activate():
+        for i in range(count):
+            payload = _transaction_payload(wallet, dest, bytes(16), 100 + i, i % 3, b"memo" * (i % 2))
+            rows.append(dict(payload, indexId=i + 1, timestamp=1700000000 + i, isContract=False))
+    return rows
+
+def test_verifies_transaction_signed_by_create(config):
+    row = _signed_rows(config, 1)[0]
+    tx = pigeonium.Transaction.fromHexDict(row)
+    verifier = SignatureVerifier()
+    with config.activate():
+        assert verifier.verify(verifier.load_key(tx.publicKey), tx)
+
+def test_rejects_tampered_transaction(config):
+    row = _signed_rows(config, 1)[0]
+    row["amount"] += 1
+    tx = pigeonium.Transaction.fromHexDict(row)
+    with config.activate():
+        assert not verify_transactions([tx])[0]
+
+def test_verify_transactions_list_and_batch(config):
+    rows = _signed_rows(config, 20)
+    rows[-1]["signature"] = "00" * 64
+    txs = [pigeonium.Transaction.fromHexDict(row) for row in rows]
+    batch = TransactionBatch.from_hex_dicts(rows)
+    with config.activate():
+        inline = [verify_transactions(txs), verify_transactions(batch)]
+    with ProcessPoolExecutor(max_workers=2, initializer=_init_signing_worker, initargs=(NETWORK_INFO,)) as pool:
+        pooled = [verify_transactions(txs, executor=pool, chunk_size=8), verify_transactions(batch, executor=pool, chunk_size=8)]
+    for bitmap in inline + pooled:
+        assert bitmap.invalid_indexes() == [19]
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import pigeonium_wire
+from pigeonium_batch import TransactionBatch
+
+def _rows(count: int, rng: random.Random, input_sizes=(0, 1, 7, 300)) -> list:
+    return [{
+        "indexId": i,
+        "source": rng.randbytes(16).hex(),
+        "dest": rng.randbytes(16).hex(),
+        "currencyId": rng.randbytes(16).hex(),
+        "amount": rng.randrange(2 ** 63),
+        "feeAmount": rng.randrange(1000),
+        "inputData": rng.randbytes(rng.choice(input_sizes)).hex(),
+        "publicKey": rng.randbytes(64).hex(),
+        "signature": rng.randbytes(64).hex(),
+        "timestamp": 1700000000 + i,
+    } for i in range(count)]
+
+def _round_trip(rows: list) -> TransactionBatch:
+    batch = pigeonium_wire.decode_transactions(pigeonium_wire.encode_transactions(rows))
+    assert len(batch) == len(rows)
+    assert [batch.row_dict(i) for i in range(len(batch))] == rows
+    return batch
+
+@pytest.mark.parametrize("count", [1, 2, 17, 500])
+def test_round_trip(count):
+    _round_trip(_rows(count, random.Random(count)))
+
+def test_empty_page():
+    batch = _round_trip([])
+    assert list(batch.amount) == []
+    assert batch.source.to_list() == []
+    assert batch.to_list() == []
+
+def test_fixed_and_variable_width():
+    rng = random.Random(1)
+    fixed = _round_trip(_rows(10, rng, input_sizes=(32,)))
+    assert fixed.inputData.offsets is None and fixed.inputData.width == 32
+    empty = _round_trip(_rows(10, rng, input_sizes=(0,)))
+    assert empty.inputData.to_list() == [b""] * 10
+    variable = _round_trip(_rows(10, rng))
+    assert variable.inputData.offsets is not None
+
+def test_large_ints_and_extra_columns():
+    rows = _rows(3, random.Random(2))
+    rows[1]["amount"] = 2 ** 64 + 1
+    for i, row in enumerate(rows):
+        row["confirmed"] = bool(i % 2)
+    batch = _round_trip(rows)
+    assert batch.amount[1] == 2 ** 64 + 1
+    assert batch.confirmed == [False, True, False]
+
+def test_take_and_encode_batch():
+    rows = _rows(50, random.Random(3))
+    batch = TransactionBatch.from_hex_dicts(rows)
+    for start, stop in [(0, 0), (0, 50), (7, 23), (49, 50), (40, 100)]:
+        part = pigeonium_wire.decode_transactions(pigeonium_wire.encode_batch(batch.take(start, stop)))
+        assert [part.row_dict(i) for i in range(len(part))] == rows[start:stop]
+
+def test_to_list_matches_columns():
+    rows = _rows(20, random.Random(4))
+    batch = _round_trip(rows)
+    for tx, row in zip(batch.to_list(), rows):
+        for key in TransactionBatch.BYTES_FIELDS:
+            assert getattr(tx, key) == bytes.fromhex(row[key])
+        for key in TransactionBatch.INT_FIELDS:
+            assert getattr(tx, key) == row[key]
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        pigeonium_wire.decode_transactions(b"[]" + bytes(16))
+
+@pytest.mark.parametrize("count", [0, 3])
+def test_rejects_truncated_pages(count):
+    data = pigeonium_wire.encode_transactions(_rows(count, random.Random(5)))
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            pigeonium_wire.decode_transactions(data[:end])
+
+def test_rejects_trailing_data():
+    data = pigeonium_wire.encode_transactions(_rows(3, random.Random(6)))
+    with pytest.raises(ValueError, match="trailing"):
+        pigeonium_wire.decode_transactions(data + b"\x00")